@@ -5,31 +5,524 @@ Uses the provided Google API key for actual AI processing
 """
 
 import asyncio
+import os
 import random
 import time
 import json
-import base64
+import re
 import io
-from typing import List, Dict, Any, Optional
+import copy
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 import aiohttp
 from PIL import Image
 
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+try:
+    import pybase64 as base64  # SIMD decoder, same API as the stdlib module
+except ImportError:
+    import base64
+
+# Request bodies are serialized up front and sent as raw bytes with this header
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+try:
+    import httpx
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Dropped, refused or timed-out connections are retried like 5xx responses
+CONNECTION_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+if HTTP2_AVAILABLE:
+    CONNECTION_ERRORS += (httpx.NetworkError, httpx.RemoteProtocolError, httpx.TimeoutException)
+
 logger = logging.getLogger(__name__)
 
+# Prepared image parts are reused by the later pipeline stages for the same document
+IMAGE_PARTS_CACHE_SIZE = 32
+
+# Vision models downscale internally, so larger images only cost upload bandwidth
+MAX_IMAGE_EDGE = int(os.getenv("GEMINI_MAX_IMAGE_EDGE", "1600"))
+
+# JSON object inside a ```json fenced block of a model reply
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.S)
+
+_json_decoder = json.JSONDecoder()
+
+def _parse_json_response(content: str) -> Any:
+    """Parse the JSON object from a model reply, fenced or bare (raises json.JSONDecodeError)"""
+    # JSON-mode replies are the whole object, so try them directly before scanning
+    if content.lstrip().startswith("{"):
+        try:
+            return json_loads(content)
+        except json.JSONDecodeError:
+            pass
+    match = _JSON_BLOCK_RE.search(content)
+    if match:
+        return json_loads(match.group(1))
+    start = content.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object in reply", content, 0)
+    # raw_decode stops at the end of the object, so trailing prose is ignored
+    return _json_decoder.raw_decode(content, start)[0]
+
+class _JsonObjectTracker:
+    """Follows streamed text and reports when the first top-level JSON object has closed"""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.started
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+# Prompt templates are filled with format_map. Per-request values only appear at the end so the
+# instructions form a byte-identical prefix across requests that Gemini can serve from its prompt cache.
+EXTRACTION_PROMPT = """
+Analyze this document image and extract the following information:
+
+Please extract:
+1. Full name of the person
+2. Document number (ID, license, passport, etc.)
+3. Date of birth
+4. Place of birth
+5. Gender
+6. Address
+7. Issue date
+8. Expiry date
+9. Any other relevant information
+
+Also provide:
+- Confidence score (0-1)
+- Quality assessment (0-1)
+- Fraud risk assessment (0-1)
+- Any issues or recommendations
+
+Return the response in JSON format with the following structure:
+{{
+    "extracted_data": {{
+        "full_name": "extracted name",
+        "document_number": "extracted number",
+        "date_of_birth": "YYYY-MM-DD",
+        "place_of_birth": "extracted place",
+        "gender": "extracted gender",
+        "address": "extracted address",
+        "issue_date": "YYYY-MM-DD",
+        "expiry_date": "YYYY-MM-DD"
+    }},
+    "confidence": 0.85,
+    "quality_score": 0.90,
+    "fraud_risk": 0.15,
+    "recommendations": ["list of recommendations"],
+    "issues": ["list of any issues found"]
+}}
+
+Document Type: {document_type}
+"""
+
+# Extraction and fraud analysis answered together, so the fraud stage needs no second call
+EXTRACTION_FRAUD_PROMPT = """
+Analyze this document image, extract its details and assess it for fraud in one answer.
+
+Extract full name, document number, date of birth, place of birth, gender, address, issue date
+and expiry date, with confidence, quality and fraud risk scores (0-1) and any issues or
+recommendations. Then check the document for signs of tampering, forgery or inconsistency.
+
+Return only JSON with this structure:
+{{
+    "extracted_data": {{
+        "full_name": "extracted name",
+        "document_number": "extracted number",
+        "date_of_birth": "YYYY-MM-DD",
+        "place_of_birth": "extracted place",
+        "gender": "extracted gender",
+        "address": "extracted address",
+        "issue_date": "YYYY-MM-DD",
+        "expiry_date": "YYYY-MM-DD"
+    }},
+    "confidence": 0.85,
+    "quality_score": 0.90,
+    "fraud_risk": 0.15,
+    "recommendations": ["list of recommendations"],
+    "issues": ["list of any issues found"],
+    "fraud_analysis": {{
+        "fraud_risk_level": "low, medium or high",
+        "fraud_indicators": ["list of indicators"],
+        "authenticity_score": 0.95,
+        "recommendations": ["list of recommendations"]
+    }}
+}}
+
+Document Type: {document_type}
+"""
+
+@lru_cache(maxsize=128)
+def render_prompt(template: str, document_type: str) -> str:
+    """Fill a prompt template once per document type and reuse the string afterwards"""
+    return template.format_map({"document_type": document_type})
+
+# One prompt covering the citizen extraction, official validation and admin assessment stages
+FULL_PIPELINE_PROMPT = """
+Analyze this document image as three review stages and answer with one JSON object.
+
+citizen: extract full name, document number, date of birth, place of birth, gender, address,
+issue date and expiry date, with confidence, quality and fraud risk scores (0-1).
+official: check the extracted data against the image and list any corrections.
+admin: give a short summary, a compliance check, recommendations and a fraud analysis.
+
+Return only JSON with this structure:
+{{
+    "citizen": {{
+        "extracted_data": {{
+            "full_name": "extracted name",
+            "document_number": "extracted number",
+            "date_of_birth": "YYYY-MM-DD",
+            "place_of_birth": "extracted place",
+            "gender": "extracted gender",
+            "address": "extracted address",
+            "issue_date": "YYYY-MM-DD",
+            "expiry_date": "YYYY-MM-DD"
+        }},
+        "confidence": 0.85,
+        "quality_score": 0.90,
+        "fraud_risk": 0.15,
+        "recommendations": ["list of recommendations"],
+        "issues": ["list of any issues found"]
+    }},
+    "official": {{
+        "validation_status": "validated or needs_review",
+        "corrections": ["field: corrected value"]
+    }},
+    "admin": {{
+        "assessment_status": "assessed or needs_review",
+        "summary": "one paragraph summary",
+        "compliance_check": {{"requirement": "met or not met"}},
+        "recommendations": ["list of recommendations"],
+        "fraud_analysis": {{
+            "fraud_risk_level": "low, medium or high",
+            "fraud_indicators": ["list of indicators"],
+            "authenticity_score": 0.95,
+            "recommendations": ["list of recommendations"]
+        }}
+    }}
+}}
+
+Document Type: {document_type}
+"""
+
+# Several documents answered in one call when request batching is enabled
+BATCH_EXTRACTION_PROMPT = """
+The images below belong to {count} separate documents. Each document's images follow a
+"Document N (type)" marker. Analyze every document independently and extract full name,
+document number, date of birth, place of birth, gender, address, issue date and expiry date,
+with confidence, quality and fraud risk scores (0-1) and any issues or recommendations.
+
+Return only JSON of the form {{"documents": [...]}} with exactly {count} entries in document
+order, each with this structure:
+{{
+    "extracted_data": {{
+        "full_name": "extracted name",
+        "document_number": "extracted number",
+        "date_of_birth": "YYYY-MM-DD",
+        "place_of_birth": "extracted place",
+        "gender": "extracted gender",
+        "address": "extracted address",
+        "issue_date": "YYYY-MM-DD",
+        "expiry_date": "YYYY-MM-DD"
+    }},
+    "confidence": 0.85,
+    "quality_score": 0.90,
+    "fraud_risk": 0.15,
+    "recommendations": ["list of recommendations"],
+    "issues": ["list of any issues found"]
+}}
+"""
+
+class BatchCoalescer:
+    """Continuous batching: a request sent while the handler is idle goes out at once; requests
+    arriving while a batch is in flight are held (at most one window) and passed on together"""
+
+    def __init__(self, handler, window: float, max_batch: int):
+        # handler: async callable taking a list of items and returning one result per item
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._running = set()
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch or not self._running:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._batch_done)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _batch_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        # Whatever queued up behind the finished batch goes next instead of waiting out the window
+        if self._pending:
+            self._flush()
+
+# Sampling settings shared by every generateContent request
+GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "topK": 32,
+    "topP": 1,
+    "maxOutputTokens": 2048,
+    # Ask for bare JSON so replies parse without fence stripping
+    "responseMimeType": "application/json"
+}
+
+GENERATION_CONFIG_JSON = json_dumps(GENERATION_CONFIG)
+
+class ImageParts(list):
+    """One document's Gemini image parts, keeping their JSON encoding for every call that sends them"""
+    __slots__ = ("_encoded",)
+
+    def __init__(self, parts=()):
+        super().__init__(parts)
+        self._encoded = None
+
+    def encoded(self) -> bytes:
+        if self._encoded is None:
+            self._encoded = b",".join(json_dumps(part) for part in self)
+        return self._encoded
+
+# Fixed framing around the parts of every generateContent body
+REQUEST_BODY_PREFIX = b'{"contents":[{"parts":['
+REQUEST_BODY_SUFFIX = b']}],"generationConfig":' + GENERATION_CONFIG_JSON + b"}"
+
+@lru_cache(maxsize=128)
+def encoded_prompt_part(prompt: str) -> bytes:
+    """JSON for the leading text part; rendered prompts repeat per document type, so encode each once"""
+    return json_dumps({"text": prompt})
+
+def build_request_body(prompt: str, image_parts: List[Dict[str, Any]]) -> bytes:
+    """Serialize a generateContent request, splicing in the image parts' cached JSON when available"""
+    if isinstance(image_parts, ImageParts):
+        images_json = image_parts.encoded()
+    else:
+        images_json = b",".join(json_dumps(part) for part in image_parts)
+    parts = encoded_prompt_part(prompt) + (b"," + images_json if images_json else b"")
+    return REQUEST_BODY_PREFIX + parts + REQUEST_BODY_SUFFIX
+
+# Upstream statuses worth retrying before giving up on a call
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class RetryableStatusError(Exception):
+    """A streamed call answered 429/5xx; carries Retry-After so the fallback backs off like any retry"""
+
+    def __init__(self, status: int, retry_after: Optional[str], message: str):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+# Fraud risk levels from least to most severe; an ensemble reports the most severe one
+FRAUD_RISK_LEVELS = ("unknown", "low", "medium", "high")
+
+def merge_fraud_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine fraud analyses from several models: mean authenticity, union of indicators, worst risk level"""
+    def union(key: str) -> List[Any]:
+        return list(dict.fromkeys(item for analysis in analyses for item in analysis.get(key) or []))
+
+    scores = [analysis["authenticity_score"] for analysis in analyses
+              if isinstance(analysis.get("authenticity_score"), (int, float))]
+    levels = [analysis.get("fraud_risk_level") for analysis in analyses]
+    return {
+        "fraud_risk_level": max(levels, key=lambda level: FRAUD_RISK_LEVELS.index(level) if level in FRAUD_RISK_LEVELS else 0),
+        "fraud_indicators": union("fraud_indicators"),
+        "authenticity_score": sum(scores) / len(scores) if scores else 0.0,
+        "recommendations": union("recommendations")
+    }
+
+# Mock answers used when every Gemini call fails; callers get copies
+FALLBACK_EXTRACTED_DATA = {
+    "national_id": {
+        "full_name": "John Doe",
+        "document_number": "1234567890",
+        "date_of_birth": "1990-01-15",
+        "place_of_birth": "Kampala",
+        "gender": "Male",
+        "address": "123 Main Street, Kampala",
+        "issue_date": "2020-01-15",
+        "expiry_date": "2030-01-15"
+    },
+    "drivers_license": {
+        "full_name": "Jane Smith",
+        "document_number": "DL123456789",
+        "date_of_birth": "1985-05-20",
+        "license_class": "B",
+        "issue_date": "2020-01-15",
+        "expiry_date": "2025-01-15",
+        "address": "456 Oak Avenue, Kampala"
+    }
+}
+
+FALLBACK_RESULT = {
+    "success": True,
+    "ai_confidence": 0.85,  # High confidence for fallback
+    "ai_quality_score": 0.90,  # High quality for fallback
+    "ai_fraud_risk": 0.10,  # Low fraud risk
+    "ai_processing_time": "1.0s",
+    "ai_recommendations": ("Document processed successfully", "Data extracted with high confidence")
+}
+
+# Files uploaded to the Gemini File API expire after 48 hours; stop reusing them a little earlier
+FILE_URI_TTL = 47 * 3600
+FILE_URI_CACHE_SIZE = 256
+
+# Bump when the prompt changes in a way that should invalidate cached responses
+PROMPT_VERSION = "2"
+
+@dataclass(slots=True)
+class PreparedImage:
+    """An uploaded image split from its data URL once; bytes and PIL image are decoded on demand"""
+    raw_b64: str
+    mime: str = "image/jpeg"
+    is_data_url: bool = False
+    _decoded: Optional[bytes] = field(default=None, repr=False)
+    _pil: Optional[Image.Image] = field(default=None, repr=False)
+
+    @classmethod
+    def from_upload(cls, image: str) -> "PreparedImage":
+        if not image.startswith('data:'):
+            return cls(raw_b64=image)
+        header, data = image.split(',', 1)
+        return cls(raw_b64=data, mime=header[5:].split(';', 1)[0] or "image/jpeg", is_data_url=True)
+
+    @property
+    def size_kb(self) -> float:
+        """Decoded size, computed from the base64 length without decoding"""
+        return (len(self.raw_b64) * 3 // 4 - self.raw_b64[-2:].count('=')) / 1024
+
+    @property
+    def decoded_bytes(self) -> bytes:
+        if self._decoded is None:
+            self._decoded = base64.b64decode(self.raw_b64)
+        return self._decoded
+
+    @property
+    def pil(self) -> Image.Image:
+        if self._pil is None:
+            self._pil = Image.open(io.BytesIO(self.decoded_bytes))
+        return self._pil
+
+    def part(self) -> Dict[str, Any]:
+        """Gemini inline_data part for this image"""
+        return {"inline_data": {"mime_type": self.mime, "data": self.raw_b64}}
+
+class ResponseCache:
+    """In-process LRU cache of parsed model responses with a time-to-live"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 7 * 86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
 class GeminiAIService:
     """AI service using Google Gemini API"""
     
     def __init__(self, api_key: Optional[str] = None):
         # Load API key from parameter or environment variable
         if api_key is None:
-            import os
             api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY is not set. Provide it via environment variable or constructor.")
         self.api_key = api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self.upload_url = "https://generativelanguage.googleapis.com/upload/v1beta"
         self.processing_times = {
             "extraction": 2.0,
             "quality_analysis": 1.5,
@@ -38,293 +531,639 @@ class GeminiAIService:
         }
         # Use a supported model for v1beta generateContent
         self.model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+        # Optional second model raced against the primary when it is slow or failing
+        self.fallback_model = os.getenv("GEMINI_FALLBACK_MODEL", "")
+        self.hedge_delay = float(os.getenv("GEMINI_HEDGE_DELAY", "2.0"))
+        # Ask both models for the fraud analysis at once and merge their answers (needs a fallback model)
+        self.fraud_ensemble = os.getenv("GEMINI_FRAUD_ENSEMBLE", "false").lower() in ("1", "true", "yes")
+        self._image_parts_cache = OrderedDict()
+        self._image_digests = OrderedDict()
+        # Endpoint URLs per (model, method), built once instead of formatted on every call
+        self._model_urls: Dict[Tuple[str, str], str] = {}
+        # Image decoding/compression gets its own pool so it never queues behind other to_thread work
+        self.image_workers = int(os.getenv("GEMINI_IMAGE_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+        self._image_executor: Optional[ThreadPoolExecutor] = None
+        # Upload images once to the File API and reference them by URI instead of inlining base64
+        self.use_file_api = os.getenv("GEMINI_USE_FILE_API", "false").lower() in ("1", "true", "yes")
+        self._file_uris = OrderedDict()
+        # One pooled HTTP session per service so calls reuse TCP/TLS connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.request_timeout = aiohttp.ClientTimeout(total=float(os.getenv("GEMINI_TIMEOUT", "60")))
+        # generateContent calls can instead share one multiplexed HTTP/2 connection (needs httpx[http2])
+        self.use_http2 = HTTP2_AVAILABLE and os.getenv("GEMINI_HTTP2", "false").lower() in ("1", "true", "yes")
+        self._http2_client = None
+        # Per-model caps on in-flight calls (and requests per minute) so bursts queue instead of hitting 429s
+        self.max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+        self.requests_per_minute = int(os.getenv("GEMINI_RPM", "0"))
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._rate_limiters: Dict[str, Any] = {}
+        # Transient upstream errors are retried with exponential backoff before the call fails
+        self.max_attempts = max(1, int(os.getenv("GEMINI_MAX_ATTEMPTS", "3")))
+        # Stream replies over SSE and stop reading as soon as the JSON answer is complete
+        self.stream_responses = os.getenv("GEMINI_STREAM", "true").lower() in ("1", "true", "yes")
+        # Extraction requests arriving within the window are sent to Gemini as one call (0 disables)
+        batch_window_ms = int(os.getenv("GEMINI_BATCH_WINDOW_MS", "0"))
+        self._batcher = None
+        if batch_window_ms > 0:
+            self._batcher = BatchCoalescer(
+                self._generate_batch,
+                window=batch_window_ms / 1000,
+                max_batch=int(os.getenv("GEMINI_MAX_BATCH", "8"))
+            )
+        # Identical images + prompt are answered from here instead of calling the model again
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv("GEMINI_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", str(7 * 86400)))
+        )
     
-    def _compress_image(self, base64_image: str, max_size_kb: int = 500) -> str:
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared HTTP session on first use (it must be bound to a running loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100, limit_per_host=30, ttl_dns_cache=300, keepalive_timeout=60, enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.request_timeout)
+        return self._session
+
+    def _get_image_executor(self) -> ThreadPoolExecutor:
+        """Create the image worker pool on first use (again after close())"""
+        if self._image_executor is None:
+            self._image_executor = ThreadPoolExecutor(max_workers=self.image_workers, thread_name_prefix="gemini-image")
+        return self._image_executor
+
+    def _model_url(self, model: str, method: str) -> str:
+        url = self._model_urls.get((model, method))
+        if url is None:
+            separator = "&" if "?" in method else "?"
+            url = self._model_urls[(model, method)] = f"{self.base_url}/models/{model}:{method}{separator}key={self.api_key}"
+        return url
+
+    def _get_http2_client(self) -> "httpx.AsyncClient":
+        if self._http2_client is None:
+            self._http2_client = httpx.AsyncClient(
+                http2=True,
+                timeout=self.request_timeout.total,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=100, keepalive_expiry=60)
+            )
+        return self._http2_client
+
+    @asynccontextmanager
+    async def _model_slot(self, model: str):
+        """Wait for a free concurrency slot (and rate-limit token) for the model"""
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+        if self.requests_per_minute > 0 and AIOLIMITER_AVAILABLE:
+            limiter = self._rate_limiters.get(model)
+            if limiter is None:
+                limiter = self._rate_limiters[model] = AsyncLimiter(self.requests_per_minute, 60)
+            await limiter.acquire()
+        async with semaphore:
+            yield
+
+    async def close(self):
+        """Close the shared HTTP session and the image worker pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._http2_client is not None:
+            await self._http2_client.aclose()
+            self._http2_client = None
+        if self._image_executor is not None:
+            self._image_executor.shutdown(wait=False, cancel_futures=True)
+            self._image_executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _compress_image(self, prepared: PreparedImage, max_size_kb: int = 500) -> PreparedImage:
         """Compress image to reduce size for API calls"""
         try:
-            if not base64_image.startswith('data:image'):
-                return base64_image
-            
-            # Extract the base64 data
-            header, data = base64_image.split(',', 1)
+            if not prepared.is_data_url or not prepared.mime.startswith('image/'):
+                return prepared
             
-            # Decode base64 to bytes
-            image_bytes = base64.b64decode(data)
+            # Check current size and dimensions (PIL reads only the header until pixels are needed)
+            current_size_kb = prepared.size_kb
+            image = prepared.pil
+            if current_size_kb <= max_size_kb and max(image.size) <= MAX_IMAGE_EDGE:
+                logger.info("📸 Image size OK: %.1fKB", current_size_kb)
+                return prepared
             
-            # Check current size
-            current_size_kb = len(image_bytes) / 1024
-            if current_size_kb <= max_size_kb:
-                print(f"📸 Image size OK: {current_size_kb:.1f}KB")
-                return base64_image
+            logger.info("📸 Compressing %sx%s image from %.1fKB to %sKB", image.size[0], image.size[1], current_size_kb, max_size_kb)
             
-            print(f"📸 Compressing image from {current_size_kb:.1f}KB to {max_size_kb}KB")
-            
-            # Open image with PIL
-            image = Image.open(io.BytesIO(image_bytes))
+            # JPEGs can be decoded straight at a reduced DCT scale, skipping most of the full-size decode
+            if image.format == 'JPEG':
+                image.draft('RGB', (MAX_IMAGE_EDGE, MAX_IMAGE_EDGE))
             
             # Convert to RGB if necessary
             if image.mode in ('RGBA', 'LA', 'P'):
                 image = image.convert('RGB')
             
-            # Calculate new dimensions (reduce by factor until size is acceptable)
+            # Cap the longest edge first; most camera photos fit the size budget after this alone
+            if max(image.size) > MAX_IMAGE_EDGE:
+                image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            
+            # Encode at least once (a small but oversized-edge image only needs the downscale),
+            # then reduce quality and dimensions until the size is acceptable
             quality = 85
-            while current_size_kb > max_size_kb and quality > 20:
-                # Reduce quality first
+            while True:
                 output = io.BytesIO()
                 image.save(output, format='JPEG', quality=quality, optimize=True)
                 compressed_bytes = output.getvalue()
                 current_size_kb = len(compressed_bytes) / 1024
+                if current_size_kb <= max_size_kb or quality <= 20:
+                    break
                 
-                if current_size_kb > max_size_kb:
-                    # If still too large, reduce dimensions
-                    width, height = image.size
-                    image = image.resize((int(width * 0.8), int(height * 0.8)), Image.Resampling.LANCZOS)
-                    quality -= 10
+                # Still too large: shrink by the estimated factor (encoded size scales with pixel area)
+                width, height = image.size
+                scale = min(0.9, max(0.5, (max_size_kb / current_size_kb) ** 0.5 * 0.95))
+                image = image.resize((int(width * scale), int(height * scale)), Image.Resampling.LANCZOS, reducing_gap=3.0)
+                quality -= 10
             
             # Encode back to base64
             compressed_base64 = base64.b64encode(compressed_bytes).decode('utf-8')
-            result = f"{header},{compressed_base64}"
+            result = PreparedImage(raw_b64=compressed_base64, mime="image/jpeg", is_data_url=True)
             
-            print(f"📸 Image compressed to {current_size_kb:.1f}KB")
+            logger.info("📸 Image compressed to %.1fKB", current_size_kb)
             return result
             
         except Exception as e:
-            print(f"⚠️ Image compression failed: {e}")
-            return base64_image
+            logger.warning("⚠️ Image compression failed: %s", e)
+            return prepared
     
     async def extract_document_information(self, images: List[str], document_type: str) -> Dict[str, Any]:
-        """Extract comprehensive information using Gemini AI"""
-        try:
-            print(f"🤖 Gemini AI Processing: Document extraction for {document_type}")
-            
-            start_time = time.time()
-            
-            # Compress large images to avoid API limits
-            compressed_images = []
-            for i, img in enumerate(images):
-                print(f"📸 Processing image {i+1}/{len(images)}")
-                compressed_img = self._compress_image(img, max_size_kb=500)
-                compressed_images.append(compressed_img)
-            
-            # Prepare the prompt for Gemini
-            prompt = f"""
-            Analyze this document image and extract the following information:
-            
-            Document Type: {document_type}
-            
-            Please extract:
-            1. Full name of the person
-            2. Document number (ID, license, passport, etc.)
-            3. Date of birth
-            4. Place of birth
-            5. Gender
-            6. Address
-            7. Issue date
-            8. Expiry date
-            9. Any other relevant information
-            
-            Also provide:
-            - Confidence score (0-1)
-            - Quality assessment (0-1)
-            - Fraud risk assessment (0-1)
-            - Any issues or recommendations
-            
-            Return the response in JSON format with the following structure:
-            {{
-                "extracted_data": {{
-                    "full_name": "extracted name",
-                    "document_number": "extracted number",
-                    "date_of_birth": "YYYY-MM-DD",
-                    "place_of_birth": "extracted place",
-                    "gender": "extracted gender",
-                    "address": "extracted address",
-                    "issue_date": "YYYY-MM-DD",
-                    "expiry_date": "YYYY-MM-DD"
-                }},
-                "confidence": 0.85,
-                "quality_score": 0.90,
-                "fraud_risk": 0.15,
-                "recommendations": ["list of recommendations"],
-                "issues": ["list of any issues found"]
-            }}
-            """
-            
-            # Use Gemini API for real AI processing with compressed images
-            result = await self._call_gemini_api(prompt, compressed_images, document_type)
-            
-            processing_time = time.time() - start_time
-            
-            return {
-                "success": True,
-                "extracted_data": result.get("extracted_data", {}),
-                "ai_confidence": max(result.get("confidence", 0.85), 0.8),  # Ensure minimum 80% confidence
-                "ai_quality_score": max(result.get("quality_score", 0.90), 0.8),  # Ensure minimum 80% quality
-                "ai_fraud_risk": min(result.get("fraud_risk", 0.15), 0.3),  # Keep fraud risk low
-                "ai_processing_time": f"{processing_time:.2f}s",
-                "ai_recommendations": result.get("recommendations", ["Document processed successfully by AI"]),
-                "ai_issues": result.get("issues", []),
-                "extracted_at": datetime.now().isoformat()
+        """Extract comprehensive information using Gemini AI (mock data when it fails)"""
+        return await self._with_fallbacks(
+            (self._extract_with_gemini, self._fallback_extraction), images, document_type
+        )
+
+    async def process_full_pipeline(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        """Run the citizen, official and admin analyses in one Gemini call (staged extraction on failure)"""
+        return await self._with_fallbacks(
+            (self._full_pipeline_with_gemini, self._extract_with_gemini, self._fallback_extraction),
+            images, document_type
+        )
+
+    async def extract_with_fraud_analysis(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        """Extract the document and analyze it for fraud with one Gemini call (extraction only on failure)"""
+        return await self._with_fallbacks(
+            (self._extract_fraud_with_gemini, self._extract_with_gemini, self._fallback_extraction),
+            images, document_type
+        )
+
+    async def _with_fallbacks(self, chain, *args) -> Dict[str, Any]:
+        """Return the first non-empty result from chain, moving on when a step fails"""
+        last_error = None
+        for step in chain:
+            try:
+                result = await step(*args)
+                if result:
+                    return result
+            except Exception as e:
+                last_error = e
+                logger.warning("⚠️ %s failed: %s", step.__name__, e)
+        raise last_error or RuntimeError("No step in the fallback chain produced a result")
+
+    async def _extract_with_gemini(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        logger.info("🤖 Gemini AI Processing: Document extraction for %s", document_type)
+        start_time = time.perf_counter()
+
+        prompt = render_prompt(EXTRACTION_PROMPT, document_type)
+        
+        # Use Gemini API for real AI processing with compressed images
+        result = await self._generate_cached(prompt, images, document_type, batchable=True)
+        return self._extraction_result(result, time.perf_counter() - start_time)
+
+    async def _extract_fraud_with_gemini(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        logger.info("🤖 Gemini AI Processing: Extraction and fraud analysis for %s", document_type)
+        start_time = time.perf_counter()
+        prompt = render_prompt(EXTRACTION_FRAUD_PROMPT, document_type)
+        result = await self._generate_cached(prompt, images, document_type, ensemble=self.fraud_ensemble)
+        if not isinstance(result.get("extracted_data"), dict):
+            raise ValueError("answer has no extracted_data")
+        return {
+            **self._extraction_result(result, time.perf_counter() - start_time),
+            "metadata": {"fraud_analysis": result.get("fraud_analysis", {})}
+        }
+
+    async def _full_pipeline_with_gemini(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        logger.info("🤖 Gemini AI Processing: Full pipeline for %s", document_type)
+        start_time = time.perf_counter()
+        prompt = render_prompt(FULL_PIPELINE_PROMPT, document_type)
+        result = await self._generate_cached(prompt, images, document_type)
+        citizen, official, admin = result["citizen"], result["official"], result["admin"]
+        if not isinstance(citizen.get("extracted_data"), dict):
+            raise ValueError("citizen section has no extracted_data")
+
+        return {
+            **self._extraction_result(citizen, time.perf_counter() - start_time),
+            "validation_status": official.get("validation_status", "validated"),
+            "assessment_status": admin.get("assessment_status", "assessed"),
+            "summary": admin.get("summary", ""),
+            "metadata": {
+                "corrections": official.get("corrections", []),
+                "compliance_check": admin.get("compliance_check", {}),
+                "recommendations": admin.get("recommendations", []),
+                "fraud_analysis": admin.get("fraud_analysis", {})
             }
-            
+        }
+
+    async def _generate_cached(self, prompt: str, images: List[str], document_type: str,
+                               batchable: bool = False, ensemble: bool = False) -> Dict[str, Any]:
+        """Answer from the response cache when possible, otherwise prepare the images and call the model"""
+        cache_key = self._cache_key(prompt, images)
+        result = self.response_cache.get(cache_key)
+        if result is not None:
+            logger.info("⚡ Using cached Gemini response")
+            return result
+        image_parts = await self._prepare_image_parts(images)
+        if batchable and self._batcher is not None:
+            result = await self._batcher.submit((prompt, image_parts, document_type))
+        elif ensemble and self.fallback_model:
+            result = await self._call_gemini_ensemble(prompt, image_parts, document_type)
+        else:
+            result = await self._call_gemini_hedged(prompt, image_parts, document_type)
+        # Raw-text answers mean the JSON could not be parsed; ask again next time
+        if "raw_response" not in result:
+            self.response_cache.set(cache_key, result)
+        return result
+
+    async def _generate_batch(self, items: List[Tuple[str, List[Dict[str, Any]], str]]) -> List[Dict[str, Any]]:
+        """Extract several documents with one Gemini call, falling back to one call per document"""
+        if len(items) == 1:
+            prompt, image_parts, document_type = items[0]
+            return [await self._call_gemini_hedged(prompt, image_parts, document_type)]
+
+        logger.info("📦 Batching %s documents into one Gemini call", len(items))
+        parts = []
+        for number, (_, image_parts, document_type) in enumerate(items, start=1):
+            parts.append({"text": f"Document {number} ({document_type})"})
+            parts.extend(image_parts)
+        try:
+            result = await self._call_gemini_hedged(BATCH_EXTRACTION_PROMPT.format_map({"count": len(items)}), parts, "batch")
+            documents = result.get("documents")
+            if isinstance(documents, list) and len(documents) == len(items) and all(isinstance(d, dict) for d in documents):
+                return documents
+            logger.warning("⚠️ Batched answer did not match the request, extracting documents one by one")
         except Exception as e:
-            print(f"❌ Gemini AI processing failed: {str(e)}")
-            # Fallback to mock data
-            return await self._fallback_extraction(document_type)
+            logger.warning("⚠️ Batched call failed, extracting documents one by one: %s", e)
+        return list(await asyncio.gather(*[
+            self._call_gemini_hedged(prompt, image_parts, document_type)
+            for prompt, image_parts, document_type in items
+        ]))
+
+    @staticmethod
+    def _extraction_result(result: Dict[str, Any], processing_time: float) -> Dict[str, Any]:
+        """Shape a parsed model answer into the extraction result returned to callers"""
+        return {
+            "success": True,
+            "extracted_data": result.get("extracted_data", {}),
+            "ai_confidence": max(result.get("confidence", 0.85), 0.8),  # Ensure minimum 80% confidence
+            "ai_quality_score": max(result.get("quality_score", 0.90), 0.8),  # Ensure minimum 80% quality
+            "ai_fraud_risk": min(result.get("fraud_risk", 0.15), 0.3),  # Keep fraud risk low
+            "ai_processing_time": f"{processing_time:.2f}s",
+            "ai_recommendations": result.get("recommendations", ["Document processed successfully by AI"]),
+            "ai_issues": result.get("issues", []),
+            "extracted_at": datetime.now().isoformat()
+        }
     
-    async def _call_gemini_api(self, prompt: str, images: List[str], document_type: str = "unknown") -> Dict[str, Any]:
+    async def _prepare_image_parts(self, images: List[str]) -> List[Dict[str, Any]]:
+        """Compress and wrap the images once per document; later stages reuse the parts"""
+        key = tuple(images)
+        parts = self._image_parts_cache.get(key)
+        if parts is not None:
+            self._image_parts_cache.move_to_end(key)
+            return parts
+
+        # Compress large images to avoid API limits (off the event loop, one worker per image)
+        logger.info("📸 Processing %s image(s)", len(images))
+        prepared = [PreparedImage.from_upload(img) for img in images]
+        loop = asyncio.get_running_loop()
+        compressed_images = await asyncio.gather(*[
+            loop.run_in_executor(self._get_image_executor(), self._compress_image, image, 500) for image in prepared
+        ])
+        if self.use_file_api:
+            parts = ImageParts(await asyncio.gather(*[self._file_part(image) for image in compressed_images]))
+        else:
+            parts = ImageParts(image.part() for image in compressed_images)
+
+        self._image_parts_cache[key] = parts
+        if len(self._image_parts_cache) > IMAGE_PARTS_CACHE_SIZE:
+            self._image_parts_cache.popitem(last=False)
+        return parts
+
+    async def _upload_file(self, image: PreparedImage) -> str:
+        """Upload image bytes to the Gemini File API (resumable protocol) and return the file URI"""
+        # Uploads share their own concurrency slots so a burst of documents cannot flood the File API
+        async with self._model_slot("files"):
+            return await self._upload_file_unbounded(image)
+
+    async def _upload_file_unbounded(self, image: PreparedImage) -> str:
+        session = await self._get_session()
+        data = image.decoded_bytes
+        start_headers = {
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(len(data)),
+            "X-Goog-Upload-Header-Content-Type": image.mime
+        }
+        async with session.post(f"{self.upload_url}/files?key={self.api_key}", headers=start_headers,
+                                json={"file": {"display_name": "publicpulse-document"}}) as response:
+            if response.status != 200:
+                raise Exception(f"File upload start failed: {response.status}")
+            session_url = response.headers["X-Goog-Upload-URL"]
+        upload_headers = {"X-Goog-Upload-Offset": "0", "X-Goog-Upload-Command": "upload, finalize"}
+        async with session.post(session_url, headers=upload_headers, data=data) as response:
+            if response.status != 200:
+                raise Exception(f"File upload failed: {response.status}")
+            body = await response.json(loads=json_loads)
+        return body["file"]["uri"]
+
+    async def _file_part(self, image: PreparedImage) -> Dict[str, Any]:
+        """file_data part for the image, uploading it unless a live upload of the same bytes exists"""
+        key = hashlib.sha256(image.raw_b64.encode("ascii")).hexdigest()
+        cached = self._file_uris.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            uri = cached[1]
+        else:
+            try:
+                uri = await self._upload_file(image)
+            except Exception as e:
+                logger.warning("⚠️ File API upload failed, sending image inline: %s", e)
+                return image.part()
+            self._file_uris[key] = (time.monotonic() + FILE_URI_TTL, uri)
+            while len(self._file_uris) > FILE_URI_CACHE_SIZE:
+                self._file_uris.popitem(last=False)
+        return {"file_data": {"mime_type": image.mime, "file_uri": uri}}
+
+    def _cache_key(self, prompt: str, images: List[str]) -> str:
+        """BLAKE2b over model, prompt version, prompt and the uploaded images as received"""
+        # Keyed on the raw uploads so a hit skips compression and File API uploads entirely
+        digest = hashlib.blake2b(f"{self.model}|{PROMPT_VERSION}|{prompt}".encode("utf-8"), digest_size=32)
+        for image in images:
+            digest.update(b"|")
+            digest.update(self._image_digest(image))
+        return digest.hexdigest()
+
+    def _image_digest(self, image: str) -> bytes:
+        """Digest of one uploaded image, computed once rather than re-encoding megabytes per stage"""
+        digest = self._image_digests.get(image)
+        if digest is None:
+            digest = hashlib.blake2b(image.encode("utf-8"), digest_size=32).digest()
+            self._image_digests[image] = digest
+            if len(self._image_digests) > IMAGE_PARTS_CACHE_SIZE * 4:
+                self._image_digests.popitem(last=False)
+        else:
+            self._image_digests.move_to_end(image)
+        return digest
+
+    async def _call_gemini_ensemble(self, prompt: str, image_parts: List[Dict[str, Any]], document_type: str = "unknown") -> Dict[str, Any]:
+        """Ask the primary and fallback models concurrently and merge their fraud analyses"""
+        results = await asyncio.gather(
+            self._call_gemini_api(prompt, image_parts, document_type),
+            self._call_gemini_api(prompt, image_parts, document_type, model=self.fallback_model),
+            return_exceptions=True
+        )
+        answers = [result for result in results if isinstance(result, dict) and "raw_response" not in result]
+        if not answers:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            return results[0]
+        analyses = [answer["fraud_analysis"] for answer in answers if isinstance(answer.get("fraud_analysis"), dict)]
+        if len(analyses) < 2:
+            return answers[0]
+        return {**answers[0], "fraud_analysis": merge_fraud_analyses(analyses)}
+
+    async def _call_gemini_hedged(self, prompt: str, image_parts: List[Dict[str, Any]], document_type: str = "unknown") -> Dict[str, Any]:
+        """Call the primary model, racing the fallback model if it has not answered within hedge_delay"""
+        if not self.fallback_model:
+            return await self._call_gemini_api(prompt, image_parts, document_type)
+
+        primary = asyncio.create_task(self._call_gemini_api(prompt, image_parts, document_type))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if primary in done and primary.exception() is None:
+                return primary.result()
+
+            logger.info("⏱️ Hedging with fallback model %s", self.fallback_model)
+            tasks = {task for task in tasks if not task.done()}
+            tasks.add(asyncio.create_task(
+                self._call_gemini_api(prompt, image_parts, document_type, model=self.fallback_model)
+            ))
+            error = primary.exception() if primary.done() else None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Whichever call lost the race (or all of them, if we were cancelled) is dropped
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before the next attempt: Retry-After if given, else 1s doubling to 16s plus jitter"""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 60.0)
+        return min(2 ** (attempt - 1), 16) + random.uniform(0, 1)
+
+    async def _post_generate(self, model: str, body: bytes, first_attempt: int = 1) -> Dict[str, Any]:
+        """POST a serialized generateContent request, retrying 429/5xx and dropped connections"""
+        url = self._model_url(model, "generateContent")
+        for attempt in range(first_attempt, self.max_attempts + 1):
+            retry_after = None
+            try:
+                async with self._model_slot(model):
+                    status, data, headers = await self._post_json(url, body)
+                if status == 200:
+                    return json_loads(data)
+                error_text = data.decode("utf-8", "replace")
+                if status not in RETRYABLE_STATUSES or attempt == self.max_attempts:
+                    logger.error("Gemini API error: %s - %s", status, error_text)
+                    raise Exception(f"API call failed: {status}")
+                retry_after = headers.get("Retry-After")
+                logger.warning("⏳ Gemini returned %s, retrying (attempt %s/%s)", status, attempt, self.max_attempts)
+            except CONNECTION_ERRORS as e:
+                if attempt == self.max_attempts:
+                    raise
+                logger.warning("⏳ Gemini connection error: %s, retrying (attempt %s/%s)", e, attempt, self.max_attempts)
+            await asyncio.sleep(self._retry_delay(attempt, retry_after))
+
+    async def _post_json(self, url: str, body: bytes) -> Tuple[int, bytes, Any]:
+        """POST a JSON body over HTTP/2 when enabled, otherwise the aiohttp session; returns status, body and headers"""
+        if self.use_http2:
+            response = await self._get_http2_client().post(url, content=body, headers=JSON_HEADERS)
+            return response.status_code, response.content, response.headers
+        session = await self._get_session()
+        async with session.post(url, data=body, headers=JSON_HEADERS) as response:
+            return response.status, await response.read(), response.headers
+
+    @staticmethod
+    def _stream_error(status: int, headers: Any, error_text: str) -> Exception:
+        """Exception for a non-200 streaming reply"""
+        if status not in RETRYABLE_STATUSES:
+            # A rejected request would be rejected again by the buffered fallback
+            return ValueError(f"API call failed: {status} - {error_text[:200]}")
+        return RetryableStatusError(
+            status, headers.get("Retry-After"), f"Streaming API call failed: {status} - {error_text[:200]}"
+        )
+
+    async def _stream_lines(self, url: str, body: bytes) -> AsyncIterator[bytes]:
+        """POST a JSON body and yield the reply line by line, over HTTP/2 when enabled, otherwise the aiohttp session"""
+        if self.use_http2:
+            async with self._get_http2_client().stream("POST", url, content=body, headers=JSON_HEADERS) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise self._stream_error(response.status_code, response.headers, response.text)
+                async for line in response.aiter_lines():
+                    yield line.encode("utf-8")
+            return
+        session = await self._get_session()
+        async with session.post(url, data=body, headers=JSON_HEADERS) as response:
+            if response.status != 200:
+                raise self._stream_error(response.status, response.headers, await response.text())
+            async for line in response.content:
+                yield line
+
+    async def _stream_generate(self, model: str, body: bytes) -> str:
+        """Stream a reply over SSE, returning once its JSON object has closed"""
+        url = self._model_url(model, "streamGenerateContent?alt=sse")
+        chunks = []
+        tracker = _JsonObjectTracker()
+        async with self._model_slot(model), aclosing(self._stream_lines(url, body)) as lines:
+            async for line in lines:
+                if not line.startswith(b"data:"):
+                    continue
+                event = json_loads(line[5:])
+                for candidate in event.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        text = part.get("text", "")
+                        chunks.append(text)
+                        if tracker.feed(text):
+                            return "".join(chunks)
+        if not chunks:
+            raise Exception("No content in streamed response")
+        return "".join(chunks)
+
+    @staticmethod
+    def _response_text(result: Dict[str, Any]) -> str:
+        """Pull the reply text out of a generateContent response body"""
+        # Only build the diagnostics (key lists, previews) when debug logging is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("🔍 Gemini API response structure: %s", list(result.keys()))
+            
+        # Handle different response structures
+        try:
+            if "candidates" in result and len(result["candidates"]) > 0:
+                candidate = result["candidates"][0]
+                if debug:
+                    logger.debug("🔍 Candidate structure: %s", list(candidate.keys()))
+                if "content" in candidate and "parts" in candidate["content"]:
+                    if debug:
+                        logger.debug("🔍 Content parts: %s", len(candidate['content']['parts']))
+                    if len(candidate["content"]["parts"]) > 0:
+                        content = candidate["content"]["parts"][0]["text"]
+                        if debug:
+                            logger.debug("🔍 Extracted content length: %s", len(content))
+                            logger.debug("🔍 Content preview: %s...", content[:200])
+                    else:
+                        logger.warning("⚠️ No parts in content")
+                        raise Exception("No content parts in response")
+                else:
+                    logger.warning("⚠️ No content or parts in candidate")
+                    logger.debug("🔍 Candidate: %s", candidate)
+                    raise Exception("No content structure in response")
+            else:
+                logger.warning("⚠️ No candidates in response")
+                logger.debug("🔍 Result: %s", result)
+                raise Exception("No candidates in response")
+        except KeyError as e:
+            logger.warning("⚠️ Response structure error: %s", e)
+            logger.debug("📋 Full response: %s", result)
+            raise Exception(f"Unexpected response structure: {e}")
+        return content
+
+    async def _call_gemini_api(self, prompt: str, image_parts: List[Dict[str, Any]], document_type: str = "unknown", model: Optional[str] = None) -> Dict[str, Any]:
         """Call Gemini API for document analysis"""
         try:
-            # Prepare content for Gemini
-            content_parts = [{"text": prompt}]
+            # Serialized once and reused by the streaming attempt and every retry
+            body = build_request_body(prompt, image_parts)
             
-            # Add images if provided
-            for img_data in images:
-                if img_data.startswith('data:image'):
-                    # Remove data URL prefix
-                    img_data = img_data.split(',')[1]
+            model = model or self.model
+            content = None
+            first_attempt = 1
+            if self.stream_responses:
+                try:
+                    content = await self._stream_generate(model, body)
+                except ValueError:
+                    raise
+                except (RetryableStatusError, *CONNECTION_ERRORS) as e:
+                    # The stream counts as attempt 1: back off before the buffered retries
+                    if self.max_attempts == 1:
+                        raise
+                    logger.warning("⏳ Streaming call failed: %s, retrying without streaming (attempt 1/%s)", e, self.max_attempts)
+                    await asyncio.sleep(self._retry_delay(1, getattr(e, "retry_after", None)))
+                    first_attempt = 2
+                except Exception as e:
+                    logger.warning("⚠️ Streaming call failed, retrying without streaming: %s", e)
+            if content is None:
+                result = await self._post_generate(model, body, first_attempt)
+                content = self._response_text(result)
                 
-                content_parts.append({
-                    "inline_data": {
-                        "mime_type": "image/jpeg",
-                        "data": img_data
-                    }
-                })
-            
-            payload = {
-                "contents": [{
-                    "parts": content_parts
-                }],
-                "generationConfig": {
-                    "temperature": 0.1,
-                    "topK": 32,
-                    "topP": 1,
-                    "maxOutputTokens": 2048
+            # Parse JSON response
+            try:
+                parsed_result = _parse_json_response(content)
+                logger.debug("✅ Successfully parsed JSON response")
+                return parsed_result
+                    
+            except json.JSONDecodeError as e:
+                logger.warning("⚠️ JSON parsing failed: %s", e)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📋 Raw content: %s...", content[:500])
+                    
+                # If JSON parsing fails, create a structured response with actual content
+                return {
+                    "extracted_data": {
+                        "full_name": "AI Analysis Complete",
+                        "document_type": document_type,
+                        "extracted_text": content[:200] + "..." if len(content) > 200 else content
+                    },
+                    "confidence": 0.85,
+                    "quality_score": 0.90,
+                    "fraud_risk": 0.10,
+                    "recommendations": ["Document analyzed by Gemini AI", "Manual review recommended"],
+                    "issues": ["JSON parsing failed - raw text extracted"],
+                    "raw_response": content
                 }
-            }
-            
-            url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"🔍 Gemini API response structure: {list(result.keys())}")
-                        
-                        # Handle different response structures
-                        try:
-                            if "candidates" in result and len(result["candidates"]) > 0:
-                                candidate = result["candidates"][0]
-                                print(f"🔍 Candidate structure: {list(candidate.keys())}")
-                                if "content" in candidate and "parts" in candidate["content"]:
-                                    print(f"🔍 Content parts: {len(candidate['content']['parts'])}")
-                                    if len(candidate["content"]["parts"]) > 0:
-                                        content = candidate["content"]["parts"][0]["text"]
-                                        print(f"🔍 Extracted content length: {len(content)}")
-                                        print(f"🔍 Content preview: {content[:200]}...")
-                                    else:
-                                        print("⚠️ No parts in content")
-                                        raise Exception("No content parts in response")
-                                else:
-                                    print("⚠️ No content or parts in candidate")
-                                    print(f"🔍 Candidate: {candidate}")
-                                    raise Exception("No content structure in response")
-                            else:
-                                print("⚠️ No candidates in response")
-                                print(f"🔍 Result: {result}")
-                                raise Exception("No candidates in response")
-                        except KeyError as e:
-                            print(f"⚠️ Response structure error: {e}")
-                            print(f"📋 Full response: {result}")
-                            raise Exception(f"Unexpected response structure: {e}")
-                        
-                        # Parse JSON response
-                        try:
-                            # Extract JSON from response
-                            json_content = content
-                            if "```json" in content:
-                                json_content = content.split("```json")[1].split("```")[0]
-                            elif "```" in content:
-                                json_content = content.split("```")[1].split("```")[0]
-                            
-                            # Try to find JSON object in the response
-                            json_match = None
-                            if "{" in json_content and "}" in json_content:
-                                start = json_content.find("{")
-                                end = json_content.rfind("}") + 1
-                                json_content = json_content[start:end]
-                            
-                            parsed_result = json.loads(json_content.strip())
-                            print(f"✅ Successfully parsed JSON response")
-                            return parsed_result
-                            
-                        except json.JSONDecodeError as e:
-                            print(f"⚠️ JSON parsing failed: {e}")
-                            print(f"📋 Raw content: {content[:500]}...")
-                            
-                            # If JSON parsing fails, create a structured response with actual content
-                            return {
-                                "extracted_data": {
-                                    "full_name": "AI Analysis Complete",
-                                    "document_type": document_type,
-                                    "extracted_text": content[:200] + "..." if len(content) > 200 else content
-                                },
-                                "confidence": 0.85,
-                                "quality_score": 0.90,
-                                "fraud_risk": 0.10,
-                                "recommendations": ["Document analyzed by Gemini AI", "Manual review recommended"],
-                                "issues": ["JSON parsing failed - raw text extracted"],
-                                "raw_response": content
-                            }
-                    else:
-                        error_text = await response.text()
-                        print(f"Gemini API error: {response.status} - {error_text}")
-                        raise Exception(f"API call failed: {response.status}")
                         
         except Exception as e:
-            print(f"Gemini API call failed: {e}")
+            logger.error("Gemini API call failed: %s", e)
             raise e
     
-    async def _fallback_extraction(self, document_type: str) -> Dict[str, Any]:
+    async def _fallback_extraction(self, images: List[str], document_type: str) -> Dict[str, Any]:
         """Fallback extraction when AI fails"""
-        print("🔄 Using fallback extraction")
+        logger.info("🔄 Using fallback extraction")
         
         # Mock data based on document type with realistic values
-        if document_type == "national_id":
-            extracted_data = {
-                "full_name": "John Doe",
-                "document_number": "1234567890",
-                "date_of_birth": "1990-01-15",
-                "place_of_birth": "Kampala",
-                "gender": "Male",
-                "address": "123 Main Street, Kampala",
-                "issue_date": "2020-01-15",
-                "expiry_date": "2030-01-15"
-            }
-        elif document_type == "drivers_license":
-            extracted_data = {
-                "full_name": "Jane Smith",
-                "document_number": "DL123456789",
-                "date_of_birth": "1985-05-20",
-                "license_class": "B",
-                "issue_date": "2020-01-15",
-                "expiry_date": "2025-01-15",
-                "address": "456 Oak Avenue, Kampala"
-            }
+        template = FALLBACK_EXTRACTED_DATA.get(document_type)
+        if template is not None:
+            extracted_data = template.copy()
         else:
-            extracted_data = {
-                "full_name": "Michael Johnson",
-                "document_type": document_type,
-                "confidence": 0.7
-            }
+            extracted_data = {"full_name": "Michael Johnson", "document_type": document_type, "confidence": 0.7}
         
         return {
-            "success": True,
+            **FALLBACK_RESULT,
             "extracted_data": extracted_data,
-            "ai_confidence": 0.85,  # High confidence for fallback
-            "ai_quality_score": 0.90,  # High quality for fallback
-            "ai_fraud_risk": 0.10,  # Low fraud risk
-            "ai_processing_time": "1.0s",
-            "ai_recommendations": ["Document processed successfully", "Data extracted with high confidence"],
+            "ai_recommendations": list(FALLBACK_RESULT["ai_recommendations"]),
             "ai_issues": [],
             "extracted_at": datetime.now().isoformat()
         }
@@ -333,21 +1172,29 @@ class GeminiAIService:
         """Test if the Gemini API is accessible"""
         try:
             url = f"{self.base_url}/models?key={self.api_key}"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    return response.status == 200
+            session = await self._get_session()
+            async with session.get(url) as response:
+                return response.status == 200
         except Exception as e:
-            print(f"Connection test failed: {e}")
+            logger.error("Connection test failed: %s", e)
             return False
 
-# Global AI service instance
-# Global instance will be created when needed with proper API key
-# ai_service = GeminiAIService()  # Removed to prevent initialization without API key
+# Global AI service instance, created on first use so importing this module needs no API key.
+# Sharing it keeps one HTTP session, image/response cache and set of rate limits per process.
+_shared_service: Optional[GeminiAIService] = None
+
+def get_gemini_service() -> GeminiAIService:
+    """Return the process-wide GeminiAIService, creating it on first call (raises ValueError without a key)"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = GeminiAIService()
+    return _shared_service
 
 # Test function
 async def test_ai_service():
     """Test the AI service"""
     print("🧪 Testing Gemini AI Service...")
+    ai_service = get_gemini_service()
     
     # Test connection
     if await ai_service.test_connection():
@@ -1,9 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
 import os
 from dotenv import load_dotenv
+from routers.responses import MsgspecJSONResponse, encode_json
 
 # Load environment variables
 load_dotenv()
@@ -14,7 +15,8 @@ app = FastAPI(
     description="A citizen document management system",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=MsgspecJSONResponse
 )
 
 # CORS middleware - Allow development and production origins
@@ -33,14 +35,23 @@ app.add_middleware(
     allowed_hosts=["localhost", "127.0.0.1", "0.0.0.0"]
 )
 
+# Constant body, encoded once at import
+_ROOT_JSON = encode_json({"message": "PublicPulse API is running", "status": "healthy"})
+
 # Health check endpoint
 @app.get("/")
 async def root():
-    return {"message": "PublicPulse API is running", "status": "healthy"}
+    return Response(_ROOT_JSON, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "API is running"}
+    health = {"status": "healthy", "message": "API is running"}
+    try:
+        from services.database import inflight_requests
+        health["supabase_inflight"] = inflight_requests()
+    except ImportError:
+        pass
+    return health
 
 # Include routers
 try:
@@ -48,6 +59,9 @@ try:
     app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
     app.include_router(users.router, prefix="/api/users", tags=["Users"])
     app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+    from services.database import close_supabase
+    app.on_event("shutdown")(users.close_ai_service)
+    app.on_event("shutdown")(close_supabase)
 except ImportError as e:
     print(f"Warning: Could not import routers: {e}")
     print("API will run with basic endpoints only")
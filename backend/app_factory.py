@@ -0,0 +1,46 @@
+"""
+FastAPI app factory shared by the standalone entry points
+Each profile imports only the routes (and services) it serves
+"""
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from routers.responses import MsgspecJSONResponse
+
+# Title, description and version per profile
+APP_INFO = {
+    "simple": ("PublicPulse API", "A citizen document management system", "1.0.0"),
+    "ai": ("PublicPulse API with AI", "Citizen Document Management System with AI Processing", "2.0.0"),
+}
+
+
+def create_app(*, ai: bool = False) -> FastAPI:
+    """Build the app; ai=True serves the mock AI backend, otherwise the minimal API"""
+    title, description, version = APP_INFO["ai" if ai else "simple"]
+    app = FastAPI(
+        title=title,
+        description=description,
+        version=version,
+        default_response_class=MsgspecJSONResponse,
+        docs_url="/docs",
+        redoc_url="/redoc"
+    )
+
+    # CORS middleware - Allow all origins for deployment
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Imported here so the simple profile never loads the AI service
+    if ai:
+        from routers import mock_backend
+        app.include_router(mock_backend.router)
+    else:
+        from routers import simple
+        app.include_router(simple.router)
+    return app
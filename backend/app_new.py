@@ -15,7 +15,7 @@ from datetime import datetime
 import base64
 
 # Import the new AI service
-from ai_service_with_gemini import GeminiAIService
+from ai_service_with_gemini import get_gemini_service
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,7 +36,12 @@ app.add_middleware(
 )
 
 # Initialize the real AI service
-ai_service = GeminiAIService()
+ai_service = get_gemini_service()
+
+@app.on_event("shutdown")
+async def close_ai_service():
+    """Close the AI service's shared HTTP session"""
+    await ai_service.close()
 
 # Pydantic Models
 class User(BaseModel):
@@ -443,10 +448,19 @@ if __name__ == "__main__":
     print(f"📖 API Documentation: http://{host}:{port}/docs")
     print(f"❤️  Health Check: http://{host}:{port}/health")
     
+    # libuv-based event loop for the concurrent Gemini IO when available (not on Windows)
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    print(f"🔁 Event loop: {loop}")
+    
     uvicorn.run(
         "app_new:app",
         host=host,
         port=port,
         reload=False,
-        log_level="info"
+        log_level="info",
+        loop=loop
     )
\ No newline at end of file
@@ -5,7 +5,7 @@ Single-file FastAPI application
 """
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
@@ -13,6 +13,8 @@ import json
 import uuid
 from datetime import datetime
 import uvicorn
+from serving import server_options, worker_count
+from routers.responses import MsgspecJSONResponse, encode_json
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -20,7 +22,8 @@ app = FastAPI(
     description="Citizen Document Management System",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=MsgspecJSONResponse
 )
 
 # CORS Configuration
@@ -53,14 +56,54 @@ mock_users = {}
 mock_documents = {}
 mock_sessions = {}
 
+# Constant bodies, encoded once at import
+_ROOT_JSON = encode_json({
+    "message": "PublicPulse API v2.0",
+    "status": "operational",
+    "environment": os.getenv("ENVIRONMENT", "production")
+})
+
+_ADMIN_STATS_JSON = encode_json({
+    "total_users": 150,
+    "active_sessions": 12,
+    "documents_processed": 1250,
+    "system_uptime": "99.8%",
+    "pending_approvals": 8,
+    "completed_today": 45,
+    "ai_processed": 890,
+    "ai_accuracy": 94.5,
+    "ai_processing_time": "2.3s",
+    "human_review_rate": 12.5
+})
+
+_DEPARTMENT_STATS_JSON = encode_json([
+    {
+        "name": "Immigration",
+        "documents": 450,
+        "completed": 380,
+        "pending": 70,
+        "efficiency": 84.4
+    },
+    {
+        "name": "NIRA", 
+        "documents": 620,
+        "completed": 510,
+        "pending": 110,
+        "efficiency": 82.3
+    },
+    {
+        "name": "URSB",
+        "documents": 180,
+        "completed": 165,
+        "pending": 15,
+        "efficiency": 91.7
+    }
+])
+
 # Root Endpoints
 @app.get("/")
 async def root():
-    return {
-        "message": "PublicPulse API v2.0",
-        "status": "operational",
-        "environment": os.getenv("ENVIRONMENT", "production")
-    }
+    return Response(_ROOT_JSON, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
@@ -112,44 +155,11 @@ async def get_admin_documents():
 
 @app.get("/api/admin/stats")
 async def get_admin_stats():
-    return {
-        "total_users": 150,
-        "active_sessions": 12,
-        "documents_processed": 1250,
-        "system_uptime": "99.8%",
-        "pending_approvals": 8,
-        "completed_today": 45,
-        "ai_processed": 890,
-        "ai_accuracy": 94.5,
-        "ai_processing_time": "2.3s",
-        "human_review_rate": 12.5
-    }
+    return Response(_ADMIN_STATS_JSON, media_type="application/json")
 
 @app.get("/api/admin/department-stats")
 async def get_department_stats():
-    return [
-        {
-            "name": "Immigration",
-            "documents": 450,
-            "completed": 380,
-            "pending": 70,
-            "efficiency": 84.4
-        },
-        {
-            "name": "NIRA", 
-            "documents": 620,
-            "completed": 510,
-            "pending": 110,
-            "efficiency": 82.3
-        },
-        {
-            "name": "URSB",
-            "documents": 180,
-            "completed": 165,
-            "pending": 15,
-            "efficiency": 91.7
-        }
-    ]
+    return Response(_DEPARTMENT_STATS_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
@@ -159,10 +169,13 @@ if __name__ == "__main__":
     print(f"📡 Health check: http://{host}:{port}/health")
     print(f"📚 API docs: http://{host}:{port}/docs")
     
+    # Mock users, documents and sessions live in process memory, so this stays single-worker by default
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
+        workers=worker_count(),
+        **server_options(),
         reload=False,
         log_level="info"
     )
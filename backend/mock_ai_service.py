@@ -0,0 +1,160 @@
+"""
+Mock AI service used by the standalone AI backend (start_ai_backend.py)
+Simulates extraction, quality analysis and fraud detection with canned results
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Mock extraction results, built once; callers get copies
+_BASIC_INFO_TEMPLATES = {
+    "national_id": {
+        "full_name": "John Doe",
+        "national_id": "1234567890",
+        "date_of_birth": "1990-01-15",
+        "place_of_birth": "Kampala",
+        "gender": "Male",
+        "address": "123 Main Street, Kampala",
+        "issue_date": "2020-01-15",
+        "expiry_date": "2030-01-15"
+    },
+    "drivers_license": {
+        "full_name": "Jane Smith",
+        "license_number": "DL123456789",
+        "date_of_birth": "1985-05-20",
+        "license_class": "B",
+        "issue_date": "2020-01-15",
+        "expiry_date": "2025-01-15",
+        "address": "456 Oak Avenue, Kampala"
+    },
+    "passport": {
+        "full_name": "Michael Johnson",
+        "passport_number": "P123456789",
+        "date_of_birth": "1988-03-10",
+        "place_of_birth": "Kampala",
+        "nationality": "Ugandan",
+        "issue_date": "2020-01-15",
+        "expiry_date": "2030-01-15"
+    }
+}
+
+_BASIC_INFO_DEFAULT = {
+    "full_name": "Alice Davis",
+    "document_type": "other",
+    "extracted_text": "Sample extracted text from document",
+    "confidence": 0.85
+}
+
+# AI Service Integration
+class AIService:
+    """AI service for document processing"""
+    
+    def __init__(self):
+        self.processing_times = {
+            "extraction": 2.0,
+            "quality_analysis": 1.5,
+            "fraud_detection": 1.0,
+            "name_extraction": 0.5
+        }
+        # Private generator for the mock scores
+        self._rng = random.Random()
+    
+    async def extract_document_information(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        """Extract comprehensive information from document images"""
+        try:
+            logger.info("🤖 AI Processing: Document extraction for %s", document_type)
+            
+            # Simulate AI processing with progress updates
+            start_time = time.perf_counter()
+            
+            # The three steps are independent, so they run concurrently
+            basic_info, quality_analysis, fraud_analysis = await asyncio.gather(
+                self._run_basic_extraction(document_type),
+                self._analyze_document_quality(images),
+                self._detect_fraud(images, document_type)
+            )
+            
+            processing_time = time.perf_counter() - start_time
+            
+            result = {
+                "success": True,
+                "extracted_data": basic_info,
+                "ai_confidence": quality_analysis["confidence"],
+                "ai_quality_score": quality_analysis["quality_score"],
+                "ai_fraud_risk": fraud_analysis["fraud_risk"],
+                "ai_processing_time": f"{processing_time:.2f}s",
+                "ai_recommendations": quality_analysis["recommendations"],
+                "ai_issues": fraud_analysis["issues"],
+                "extracted_at": datetime.now().isoformat()
+            }
+            
+            logger.info("✅ Document extraction completed in %.2fs", processing_time)
+            return result
+            
+        except Exception as e:
+            logger.error("❌ AI extraction failed: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "extracted_data": {}
+            }
+    
+    async def _run_basic_extraction(self, document_type: str) -> Dict[str, Any]:
+        """Step 1: extract basic information"""
+        await asyncio.sleep(self.processing_times["extraction"] * 0.4)
+        basic_info = self._extract_basic_info(document_type)
+        logger.debug("📄 Step 1: Basic information extracted")
+        return basic_info
+    
+    def _extract_basic_info(self, document_type: str) -> Dict[str, Any]:
+        """Extract basic information based on document type"""
+        template = _BASIC_INFO_TEMPLATES.get(document_type)
+        if template is not None:
+            return dict(template)
+        return {**_BASIC_INFO_DEFAULT, "document_type": document_type}
+    
+    async def _analyze_document_quality(self, images: List[str]) -> Dict[str, Any]:
+        """Step 2: analyze document quality"""
+        await asyncio.sleep(0.5 + self.processing_times["quality_analysis"] * 0.3)
+        logger.debug("🔍 Step 2: Quality analysis completed")
+        
+        return {
+            "quality_score": self._rng.uniform(0.7, 0.95),
+            "confidence": self._rng.uniform(0.8, 0.95),
+            "recommendations": [
+                "Document quality is good",
+                "All required information is visible",
+                "No signs of tampering detected",
+                "Image resolution is adequate for processing"
+            ]
+        }
+    
+    async def _detect_fraud(self, images: List[str], document_type: str) -> Dict[str, Any]:
+        """Step 3: detect potential fraud indicators"""
+        await asyncio.sleep(0.5 + self.processing_times["fraud_detection"] * 0.3)
+        logger.debug("🛡️ Step 3: Fraud detection completed")
+        
+        # Simulate fraud detection
+        fraud_risk = self._rng.uniform(0.1, 0.3)
+        issues = []
+        
+        if fraud_risk > 0.7:
+            issues.append("High fraud risk detected")
+        elif fraud_risk > 0.4:
+            issues.append("Medium fraud risk detected")
+        else:
+            issues.append("Low fraud risk - document appears authentic")
+        
+        return {
+            "fraud_risk": fraud_risk,
+            "issues": issues
+        }
+
+# Initialize AI service
+ai_service = AIService()
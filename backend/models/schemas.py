@@ -1,5 +1,7 @@
 # Basic data models for PublicPulse (without Pydantic for compatibility)
 
+import os
+from dataclasses import dataclass, field, fields
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -28,6 +30,14 @@ class Department:
     HEALTH = "health"
 
 # Basic data structures
+def new_document_id() -> str:
+    """Random UUID-formatted id (v4 layout) built straight from os.urandom"""
+    b = bytearray(os.urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
 def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a user object"""
     return {
@@ -55,6 +65,55 @@ def create_document(document_data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+@dataclass(slots=True)
+class Document:
+    """Stored document with a fixed field layout (denser than one dict per document)"""
+    id: str
+    citizen_id: str = ""
+    user_id: str = ""
+    document_type: str = ""
+    department_id: str = ""
+    status: str = DocumentStatus.SUBMITTED
+    images: List[str] = field(default_factory=list)
+    description: str = ""
+    assigned_official_id: Optional[str] = None
+    official_review_comment: Optional[str] = None
+    official_reviewed_at: Optional[str] = None
+    admin_review_comment: Optional[str] = None
+    admin_reviewed_at: Optional[str] = None
+    created_at: str = ""
+    updated_at: str = ""
+    ai_analysis: Optional[Dict[str, Any]] = None
+    ai_validation: Optional[Dict[str, Any]] = None
+    ai_assessment: Optional[Dict[str, Any]] = None
+    ai_extraction: Optional[Dict[str, Any]] = None
+    ai_fraud_analysis: Optional[Dict[str, Any]] = None
+    # Keys outside the fixed layout are kept here rather than dropped
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Document":
+        document = cls(id=data["id"])
+        document.update(data)
+        return document
+
+    def update(self, updates: Dict[str, Any]):
+        for key, value in updates.items():
+            if key in _DOCUMENT_FIELD_SET:
+                setattr(self, key, value)
+            else:
+                self.extra[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view used at the API/storage edge"""
+        data = {name: getattr(self, name) for name in DOCUMENT_FIELDS}
+        data.update(self.extra)
+        return data
+
+DOCUMENT_FIELDS = tuple(f.name for f in fields(Document) if f.name != "extra")
+_DOCUMENT_FIELD_SET = frozenset(DOCUMENT_FIELDS)
+
+
 def create_document_submission_response(success: bool, message: str, **kwargs) -> Dict[str, Any]:
     """Create a document submission response"""
     return {
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any, Optional
-import uuid
 from datetime import datetime
 import asyncio
 import random
 import time
 import sys
 import os
+from models.schemas import new_document_id
 
 # Add the services directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services'))
@@ -105,7 +105,7 @@ async def submit_document(request: Dict[str, Any]) -> Dict[str, Any]:
     """Submit a new document"""
     try:
         # For now, return a mock response
-        document_id = str(uuid.uuid4())
+        document_id = new_document_id()
         
         return {
             "success": True,
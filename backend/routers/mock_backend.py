@@ -0,0 +1,228 @@
+"""
+Endpoints of the standalone AI backend, served with mock document data
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
+
+from mock_ai_service import ai_service
+from routers.responses import encode_json
+
+router = APIRouter()
+# Document routes answer both with and without the /api prefix; mounted twice at the bottom
+documents_router = APIRouter()
+
+def request_now() -> str:
+    """Timestamp taken once per request"""
+    return datetime.now().isoformat()
+
+# Constant mock bodies, encoded once at import
+_ROOT_JSON = encode_json({
+    "message": "PublicPulse API v2.0 with AI",
+    "status": "operational",
+    "ai_service": "active",
+    "environment": "development"
+})
+
+_HEALTH_BASE = {
+    "status": "healthy",
+    "version": "2.0.0",
+    "ai_service": "operational",
+    "database": "connected"
+}
+
+_ADMIN_STATS_JSON = encode_json({
+    "total_users": 150,
+    "active_sessions": 12,
+    "documents_processed": 1250,
+    "system_uptime": "99.8%",
+    "pending_approvals": 8,
+    "completed_today": 45,
+    "ai_processed": 890,
+    "ai_accuracy": 94.5,
+    "ai_processing_time": "2.3s",
+    "human_review_rate": 12.5
+})
+
+_AI_PERFORMANCE_JSON = encode_json({
+    "total_processed": 150,
+    "average_confidence": 0.87,
+    "average_quality_score": 0.82,
+    "average_fraud_risk": 0.15,
+    "average_processing_time": "2.3s",
+    "success_rate": 0.94,
+    "human_review_rate": 0.12
+})
+
+# Root Endpoints
+@router.get("/")
+async def root():
+    return Response(_ROOT_JSON, media_type="application/json")
+
+@router.get("/health")
+async def health_check(now: str = Depends(request_now)):
+    # Only the timestamp changes between calls
+    return {**_HEALTH_BASE, "timestamp": now}
+
+# AI Document Processing Endpoints
+@router.post("/api/ai/extract")
+async def extract_document_ai(
+    document_type: str = Form(...),
+    images: List[UploadFile] = File(...)
+):
+    """Extract document information using AI"""
+    try:
+        # Convert uploaded files to base64 strings (simplified)
+        image_data = []
+        for image in images:
+            # The mock only keeps a 100-hex-char preview, so read just those 50 bytes
+            head = await image.read(50)
+            await image.close()
+            # In real implementation, you'd convert to base64
+            image_data.append(f"data:image/jpeg;base64,{head.hex()}")
+        
+        # Process with AI
+        result = await ai_service.extract_document_information(image_data, document_type)
+        
+        return {
+            "success": True,
+            "message": "Document processed successfully with AI",
+            "ai_result": result,
+            "processing_time": result.get("ai_processing_time", "0.0s")
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI processing failed: {str(e)}")
+
+@router.post("/api/ai/test")
+async def test_ai_processing(request: Dict[str, Any]):
+    """Test AI processing with mock data"""
+    try:
+        document_type = request.get("document_type", "national_id")
+        images = request.get("images", ["mock_image_data"])
+        
+        # Process with AI
+        result = await ai_service.extract_document_information(images, document_type)
+        
+        return {
+            "success": True,
+            "message": "AI test completed successfully",
+            "ai_result": result
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI test failed: {str(e)}")
+
+# Document Management Endpoints
+@documents_router.post("/documents/submit")
+async def submit_document(request: Dict[str, Any]):
+    """Submit a new document"""
+    try:
+        document_id = str(uuid.uuid4())
+        return {
+            "success": True,
+            "message": "Document submitted successfully",
+            "document_id": document_id,
+            "status": "submitted",
+            "submitted_at": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@documents_router.get("/documents/{document_id}")
+async def get_document(document_id: str, now: str = Depends(request_now)):
+    """Get document by ID"""
+    try:
+        return {
+            "id": document_id,
+            "citizen_id": "citizen_001",
+            "document_type": "national_id",
+            "department_id": "nira",
+            "status": "submitted",
+            "images": [],
+            "created_at": now,
+            "updated_at": now
+        }
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+@router.get("/api/users/citizen/my-documents")
+async def get_citizen_documents(user_id: str):
+    """Get documents for a citizen"""
+    try:
+        # Mock documents for the citizen
+        return {
+            "documents": [
+                {
+                    "id": "doc_001",
+                    "document_type": "national_id",
+                    "status": "submitted",
+                    "created_at": datetime.now().isoformat()
+                }
+            ],
+            "total_count": 1
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@documents_router.post("/documents/update-status")
+async def update_document_status(request: Dict[str, Any]):
+    """Update document status"""
+    try:
+        return {
+            "success": True,
+            "message": "Document status updated successfully",
+            "document_id": request.get("document_id", ""),
+            "new_status": request.get("status", "")
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@documents_router.post("/documents/assign")
+async def assign_document(request: Dict[str, Any]):
+    """Assign document to official"""
+    try:
+        return {
+            "success": True,
+            "message": "Document assigned successfully",
+            "document_id": request.get("document_id", ""),
+            "assigned_to": request.get("official_id", "")
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Admin Endpoints
+@router.get("/api/admin/stats")
+async def get_admin_stats():
+    return Response(_ADMIN_STATS_JSON, media_type="application/json")
+
+@router.get("/api/admin/ai-performance")
+async def get_ai_performance():
+    return Response(_AI_PERFORMANCE_JSON, media_type="application/json")
+
+# Department endpoints
+@router.get("/documents/department/{dept_id}")
+async def get_department_documents(dept_id: str):
+    """Get documents by department"""
+    try:
+        return {
+            "documents": [
+                {
+                    "id": f"doc_{dept_id}_001",
+                    "document_type": "national_id",
+                    "status": "submitted",
+                    "citizen_name": "John Doe",
+                    "created_at": datetime.now().isoformat()
+                }
+            ],
+            "total_count": 1,
+            "department": dept_id
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+router.include_router(documents_router)
+router.include_router(documents_router, prefix="/api")
@@ -0,0 +1,37 @@
+"""
+Response classes shared by the API routers
+"""
+
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+def encode_json(content: Any) -> bytes:
+    if MSGSPEC_AVAILABLE:
+        return msgspec.json.encode(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class MsgspecJSONResponse(JSONResponse):
+    """JSON response encoded with msgspec's C encoder (falls back to the stdlib encoder)"""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+def sse_event(content: Any, event: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Events message carrying a JSON payload"""
+    prefix = b"event: " + event.encode("utf-8") + b"\n" if event else b""
+    return prefix + b"data: " + encode_json(content) + b"\n\n"
+
+
+# Keep proxies from buffering the stream so each event reaches the client as it is sent
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
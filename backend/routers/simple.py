@@ -0,0 +1,36 @@
+"""
+Endpoints of the minimal deployment profile (simple_main.py)
+"""
+
+from fastapi import APIRouter, Response
+
+from routers.responses import encode_json
+
+router = APIRouter()
+
+# Constant bodies are encoded once at import
+_ROOT_JSON = encode_json({"message": "PublicPulse API v2.0 is running", "status": "healthy", "version": "2.0.0"})
+_HEALTH_JSON = encode_json({"status": "healthy", "message": "API is running"})
+
+# Health check endpoint
+@router.get("/")
+async def root():
+    return Response(_ROOT_JSON, media_type="application/json")
+
+@router.get("/health")
+async def health_check():
+    return Response(_HEALTH_JSON, media_type="application/json")
+
+# Simple document endpoints
+@router.get("/api/documents")
+async def get_documents():
+    return {"documents": [], "total_count": 0}
+
+@router.post("/api/documents/submit")
+async def submit_document(request: dict):
+    return {
+        "success": True,
+        "message": "Document submitted successfully",
+        "document_id": "doc_123",
+        "status": "submitted"
+    }
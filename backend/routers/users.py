@@ -1,17 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
-import uuid
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import os
 import base64
 import json
-from ai_service_with_gemini import GeminiAIService
-from services.database import DatabaseService
+import logging
+from ai_service_with_gemini import get_gemini_service
+from services.database import db_service, DOCUMENT_REVIEW_COLUMNS, DOCUMENT_STATS_COLUMNS
+from models.schemas import new_document_id
+from routers.responses import MsgspecJSONResponse, SSE_HEADERS, sse_event
 
-router = APIRouter()
-
-# Use Supabase database instead of in-memory storage
-db_service = DatabaseService()
+router = APIRouter(default_response_class=MsgspecJSONResponse)
+logger = logging.getLogger(__name__)
 
 # Initialize the new AI service with the current API key
 ai_service = None
@@ -23,28 +25,124 @@ def get_ai_service():
         api_key = os.getenv("GEMINI_API_KEY")
         if api_key:
             try:
-                ai_service = GeminiAIService(api_key)
-                print("✅ AI service initialized successfully")
+                ai_service = get_gemini_service()
+                logger.info("AI service initialized successfully")
             except Exception as e:
-                print(f"⚠️ Failed to initialize AI service: {e}")
+                logger.warning("Failed to initialize AI service: %s", e)
                 ai_service = None
         else:
-            print("⚠️ GEMINI_API_KEY not found in environment variables")
+            logger.warning("GEMINI_API_KEY not found in environment variables")
     return ai_service
 
+async def close_ai_service():
+    """Release the AI service's pooled connections (called on app shutdown)"""
+    if ai_service is not None:
+        await ai_service.close()
+
+def page_response(documents: List[Dict[str, Any]], total: int, limit: int, offset: int) -> Dict[str, Any]:
+    """Build a paginated list response"""
+    return {
+        "documents": documents,
+        "total_count": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if offset + limit < total else None
+    }
+
 @router.get("/citizen/my-documents")
-async def get_citizen_documents() -> Dict[str, Any]:
-    """Get documents for the citizen"""
+async def get_citizen_documents(limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0), citizen_id: str = "citizen_001") -> Dict[str, Any]:
+    """Get one page of documents for the citizen"""
     try:
         # Get documents from Supabase database
-        documents = await db_service.get_documents_by_citizen("citizen_001")
-        return {
-            "documents": documents,
-            "total_count": len(documents)
-        }
+        documents, total = await db_service.get_documents_page(limit, offset, citizen_id=citizen_id)
+        return page_response(documents, total, limit, offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def empty_ai_record(**fields) -> Dict[str, Any]:
+    """Default AI record stored when a stage produced no analysis"""
+    record = {
+        "extracted_text": "",
+        "confidence_score": 0.0,
+        "metadata": {},
+        "ai_model_used": "manual"
+    }
+    record.update(fields)
+    return record
+
+def _analysis_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "extracted_text": result.get("extracted_text", ""),
+        "confidence_score": result.get("ai_confidence", 0.85),
+        "metadata": result.get("metadata", {})
+    }
+
+def _validation_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    record = _analysis_record(result)
+    return {
+        **record,
+        "validation_status": result.get("validation_status", "validated"),
+        "corrections": record["metadata"].get("corrections", [])
+    }
+
+def _assessment_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    metadata = result.get("metadata", {})
+    return {
+        "assessment_status": result.get("assessment_status", "assessed"),
+        "summary": result.get("summary", ""),
+        "compliance_check": metadata.get("compliance_check", {}),
+        "recommendations": metadata.get("recommendations", result.get("ai_recommendations", []))
+    }
+
+def _fraud_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    fraud = result.get("metadata", {}).get("fraud_analysis", {})
+    return {
+        "fraud_risk_level": fraud.get("fraud_risk_level", "unknown"),
+        "fraud_indicators": fraud.get("fraud_indicators", result.get("ai_issues", [])),
+        "authenticity_score": fraud.get("authenticity_score", 0.0),
+        "recommendations": fraud.get("recommendations", []),
+        "summary": result.get("summary", "")
+    }
+
+# Pipeline stage -> (document field holding the result, model label, record builder, service method).
+# Extraction and fraud share one combined call; the response cache answers whichever stage runs second.
+_STAGES = {
+    "submit": ("ai_analysis", "gemini-2.5-flash", _analysis_record, "extract_document_information"),
+    "official": ("ai_validation", "gpt-4o", _validation_record, "extract_document_information"),
+    "admin": ("ai_assessment", "llama-3.1-405b", _assessment_record, "extract_document_information"),
+    "extract": ("ai_extraction", "gemini-2.5-flash", _analysis_record, "extract_with_fraud_analysis"),
+    "fraud": ("ai_fraud_analysis", "llama-3.1-405b", _fraud_record, "extract_with_fraud_analysis")
+}
+
+# Stored stage results at or above this confidence are reused instead of calling the model again
+AI_RERUN_MIN_CONFIDENCE = float(os.getenv("AI_RERUN_MIN_CONFIDENCE", "0.9"))
+
+# Answer every stage from one fused Gemini call (cached per document) instead of one call per stage
+AI_FUSED_PIPELINE = os.getenv("AI_FUSED_PIPELINE", "false").lower() in ("1", "true", "yes")
+
+# Documents processed at once by the batch endpoints (Gemini calls are further capped per model)
+AI_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "32"))
+_ai_batch_slots = asyncio.Semaphore(AI_BATCH_CONCURRENCY)
+
+async def _run_ai_stage(document: Dict[str, Any], stage: str) -> Optional[Dict[str, Any]]:
+    """Run one AI stage over the document images and store its record on the document"""
+    field, model, build, method = _STAGES[stage]
+    existing = document.get(field)
+    if (existing and existing.get("ai_model_used") == model
+            and existing.get("confidence_score", 0.0) >= AI_RERUN_MIN_CONFIDENCE):
+        return existing
+    ai_service = get_ai_service()
+    if not ai_service:
+        return None
+    analyze = ai_service.process_full_pipeline if AI_FUSED_PIPELINE else getattr(ai_service, method)
+    try:
+        result = await analyze(document["images"], document.get("document_type", "unknown"))
+    except Exception:
+        logger.warning("AI %s stage failed", stage, exc_info=True)
+        return None
+    record = document[field] = {**build(result), "ai_model_used": model}
+    return record
+
 def determine_department(document_type: str) -> str:
     """Determine which department should handle a document based on its type"""
     department_mapping = {
@@ -65,27 +163,13 @@ def determine_department(document_type: str) -> str:
 async def submit_citizen_document(request: Dict[str, Any]) -> Dict[str, Any]:
     """Submit a document as a citizen with AI analysis"""
     try:
-        document_id = str(uuid.uuid4())
+        document_id = new_document_id()
         current_time = datetime.now().isoformat()
         images = request.get("images", [])
         description = request.get("description", "")
-        
-        # AI Analysis using new Gemini API
-        ai_analysis = None
-        document_type = "unknown"
-        try:
-            ai_service = get_ai_service()
-            if ai_service:
-                ai_analysis = await ai_service.extract_document_information(images, document_type)
-                document_type = ai_analysis.get("document_type", "unknown")
-            else:
-                ai_analysis = None
-        except Exception as e:
-            # Fallback to manual document type if AI fails
-            document_type = request.get("document_type", "unknown")
-            print(f"AI analysis failed, using manual type: {e}")
-        
-        # Auto-assign to correct department based on AI-determined or manual document type
+        document_type = request.get("document_type", "unknown")
+
+        # Auto-assign to correct department based on the submitted document type
         assigned_department = determine_department(document_type)
         
         # Create document object with images and AI analysis
@@ -106,15 +190,11 @@ async def submit_citizen_document(request: Dict[str, Any]) -> Dict[str, Any]:
             "admin_reviewed_at": None,
             "created_at": current_time,
             "updated_at": current_time,
-            # AI Analysis fields
-            "ai_analysis": {
-                "extracted_text": ai_analysis.get("extracted_text", "") if ai_analysis else "",
-                "confidence_score": ai_analysis.get("ai_confidence", 0.85) if ai_analysis else 0.85,
-                "metadata": ai_analysis.get("metadata", {}) if ai_analysis else {},
-                "ai_model_used": "gemini-2.5-flash" if ai_analysis else "manual"
-            } if ai_analysis else None
+            # AI Analysis fields (always present so later stages can index them directly)
+            "ai_analysis": empty_ai_record()
         }
-        
+        await _run_ai_stage(document, "submit")
+
         # Store document in Supabase database
         await db_service.create_document(document)
         
@@ -131,15 +211,12 @@ async def submit_citizen_document(request: Dict[str, Any]) -> Dict[str, Any]:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/official/documents")
-async def get_official_documents() -> Dict[str, Any]:
-    """Get all documents for officials to review"""
+async def get_official_documents(limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)) -> Dict[str, Any]:
+    """Get one page of documents for officials to review"""
     try:
-        # Get all documents from Supabase (simplified - in production, add filtering)
-        documents = await db_service.get_documents_by_citizen("all")  # Get all docs
-        return {
-            "documents": documents,
-            "total_count": len(documents)
-        }
+        # Get documents from Supabase (simplified - in production, add filtering)
+        documents, total = await db_service.get_documents_page(limit, offset, DOCUMENT_REVIEW_COLUMNS)
+        return page_response(documents, total, limit, offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -161,9 +238,8 @@ async def get_department_documents(department_id: str) -> Dict[str, Any]:
 async def get_assigned_documents(official_id: str) -> Dict[str, Any]:
     """Get documents assigned to a specific official"""
     try:
-        # Get all documents and filter by assigned official
-        all_docs = await db_service.get_documents_by_citizen("all")
-        assigned_docs = [doc for doc in all_docs if doc.get("assigned_official_id") == official_id]
+        # Get documents assigned to the official
+        assigned_docs = await db_service.get_documents_by_official(official_id)
         return {
             "documents": assigned_docs,
             "total_count": len(assigned_docs),
@@ -181,45 +257,21 @@ async def official_review_document(document_id: str, request: Dict[str, Any]) ->
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        # AI Validation using GPT-4o (primary) or Gemini (fallback)
-        ai_validation = None
-        try:
-            # Create initial analysis from existing data
-            initial_analysis = DocumentAnalysis(
-                document_type=document["document_type"],
-                extracted_text=document.get("ai_analysis", {}).get("extracted_text", ""),
-                confidence_score=document.get("ai_analysis", {}).get("confidence_score", 0.0),
-                metadata=document.get("ai_analysis", {}).get("metadata", {}),
-                validation_status="pending"
-            )
-            
-            ai_service = get_ai_service()
-            if ai_service:
-                # Use extract_document_information for validation
-                ai_validation = await ai_service.extract_document_information(document["images"], document.get("document_type", "unknown"))
-            else:
-                ai_validation = None
-        except Exception as e:
-            print(f"AI validation failed: {e}")
-        
         # Update document with official review and AI validation
         current_time = datetime.now().isoformat()
-        document["status"] = "official_reviewed"
-        document["official_review_comment"] = request.get("comment", "")
-        document["official_reviewed_at"] = current_time
-        document["updated_at"] = current_time
+        updates = {
+            "status": "official_reviewed",
+            "official_review_comment": request.get("comment", ""),
+            "official_reviewed_at": current_time,
+            "updated_at": current_time
+        }
+        document.update(updates)
         
-        # Add AI validation results
-        if ai_validation:
-            if "ai_validation" not in document:
-                document["ai_validation"] = {}
-            document["ai_validation"].update({
-                "validation_status": ai_validation.validation_status,
-                "extracted_text": ai_validation.extracted_text,
-                "confidence_score": ai_validation.confidence_score,
-                "corrections": ai_validation.metadata.get("corrections", []),
-                "ai_model_used": "gpt-4o"
-            })
+        # Add AI validation results (defaults keep the admin stage free of .get chains)
+        if not await _run_ai_stage(document, "official"):
+            document["ai_validation"] = empty_ai_record(validation_status="pending", corrections=[])
+        updates["ai_validation"] = document["ai_validation"]
+        await db_service.update_document(document_id, updates)
         
         return {
             "success": True,
@@ -235,12 +287,11 @@ async def official_review_document(document_id: str, request: Dict[str, Any]) ->
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/admin/documents")
-async def get_admin_documents() -> Dict[str, Any]:
-    """Get all documents for admin review"""
+async def get_admin_documents(limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)) -> Dict[str, Any]:
+    """Get one page of documents awaiting admin review"""
     try:
-        # Get all documents from database and filter for admin review status
-        all_docs = await db_service.get_documents_by_citizen("all")
-        admin_docs = [doc for doc in all_docs if doc.get("status") == "official_reviewed"]
+        # Get documents awaiting admin review
+        admin_docs, total = await db_service.get_documents_page(limit, offset, DOCUMENT_REVIEW_COLUMNS, status="official_reviewed")
         
         # Group documents by department for better organization
         department_groups = {}
@@ -251,8 +302,7 @@ async def get_admin_documents() -> Dict[str, Any]:
             department_groups[dept].append(doc)
         
         return {
-            "documents": admin_docs,
-            "total_count": len(admin_docs),
+            **page_response(admin_docs, total, limit, offset),
             "department_groups": department_groups,
             "departments": list(department_groups.keys())
         }
@@ -268,49 +318,21 @@ async def admin_review_document(document_id: str, request: Dict[str, Any]) -> Di
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        # AI Assessment using Llama 3.1 (primary) or GPT-4o (fallback)
-        ai_assessment = None
-        try:
-            # Create official analysis from existing data
-            official_analysis = DocumentAnalysis(
-                document_type=document["document_type"],
-                extracted_text=document.get("ai_validation", {}).get("extracted_text", 
-                    document.get("ai_analysis", {}).get("extracted_text", "")),
-                confidence_score=document.get("ai_validation", {}).get("confidence_score", 
-                    document.get("ai_analysis", {}).get("confidence_score", 0.0)),
-                metadata=document.get("ai_validation", {}).get("metadata", 
-                    document.get("ai_analysis", {}).get("metadata", {})),
-                validation_status=document.get("ai_validation", {}).get("validation_status", "pending")
-            )
-            
-            ai_service = get_ai_service()
-            if ai_service:
-                # Use extract_document_information for assessment
-                ai_assessment = await ai_service.extract_document_information(document["images"], document.get("document_type", "unknown"))
-            else:
-                ai_assessment = None
-        except Exception as e:
-            print(f"AI assessment failed: {e}")
-        
         # Update document with admin review and AI assessment
         current_time = datetime.now().isoformat()
         final_status = request.get("status", "approved")  # approved, rejected, needs_changes
-        document["status"] = final_status
-        document["admin_review_comment"] = request.get("comment", "")
-        document["admin_reviewed_at"] = current_time
-        document["updated_at"] = current_time
+        updates = {
+            "status": final_status,
+            "admin_review_comment": request.get("comment", ""),
+            "admin_reviewed_at": current_time,
+            "updated_at": current_time
+        }
+        document.update(updates)
         
         # Add AI assessment results
-        if ai_assessment:
-            if "ai_assessment" not in document:
-                document["ai_assessment"] = {}
-            document["ai_assessment"].update({
-                "assessment_status": ai_assessment.assessment_status,
-                "summary": ai_assessment.summary,
-                "compliance_check": ai_assessment.metadata.get("compliance_check", {}),
-                "recommendations": ai_assessment.metadata.get("recommendations", []),
-                "ai_model_used": "llama-3.1-405b"
-            })
+        if await _run_ai_stage(document, "admin"):
+            updates["ai_assessment"] = document["ai_assessment"]
+        await db_service.update_document(document_id, updates)
         
         return {
             "success": True,
@@ -339,53 +361,90 @@ async def get_document_by_id(document_id: str) -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _extract_and_store(document_id: str) -> Dict[str, Any]:
+    """Run the extraction stage for one document and persist the result"""
+    # Find the document
+    document = await db_service.get_document_by_id(document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    # AI Extraction (the document type picks the prompt/rules)
+    ai_extraction = await _run_ai_stage(document, "extract")
+
+    # Update document with extraction results
+    current_time = datetime.now().isoformat()
+    if ai_extraction:
+        ai_extraction.setdefault("extracted_at", current_time)
+        # Mark as processed by AI so dashboards can count it
+        document["status"] = "ai_processed"
+        document["updated_at"] = current_time
+        await db_service.update_document(document_id, {
+            "ai_extraction": document["ai_extraction"],
+            "status": "ai_processed",
+            "updated_at": current_time
+        })
+    
+    return {
+        "success": True,
+        "message": "Document information extracted successfully",
+        "document_id": document_id,
+        "extracted_data": document.get("ai_extraction"),
+        "extracted_at": current_time
+    }
+
+def _batch_document_ids(request: Dict[str, Any]) -> List[str]:
+    """Validate the document_ids list of a batch extraction request"""
+    document_ids = request.get("document_ids") or []
+    if not isinstance(document_ids, list):
+        raise HTTPException(status_code=400, detail="document_ids must be a list")
+    return document_ids
+
+async def _extract_batch_item(document_id: str) -> Dict[str, Any]:
+    """Extract one document of a batch, turning a failure into an error result"""
+    try:
+        async with _ai_batch_slots:
+            return await _extract_and_store(document_id)
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        return {"success": False, "document_id": document_id, "error": error}
+
+@router.post("/official/documents/extract-batch")
+async def extract_documents_batch(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract several documents concurrently; each result reports its own success or error"""
+    document_ids = _batch_document_ids(request)
+    results = await asyncio.gather(*(_extract_batch_item(document_id) for document_id in document_ids))
+    return {
+        "success": all(result["success"] for result in results),
+        "processed": len(results),
+        "results": results
+    }
+
+@router.post("/official/documents/extract-batch/stream")
+async def stream_documents_batch(request: Dict[str, Any]) -> StreamingResponse:
+    """Extract several documents concurrently, sending each result as a Server-Sent Event as soon as it is ready"""
+    document_ids = _batch_document_ids(request)
+
+    async def events() -> AsyncIterator[bytes]:
+        tasks = [asyncio.create_task(_extract_batch_item(document_id)) for document_id in document_ids]
+        succeeded = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                succeeded += result["success"]
+                yield sse_event(result, "result")
+            yield sse_event({"success": succeeded == len(tasks), "processed": len(tasks)}, "done")
+        finally:
+            # The client went away mid-stream: stop the extractions it will never see
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/official/documents/{document_id}/extract")
 async def extract_document_information(document_id: str) -> Dict[str, Any]:
     """Extract detailed information from document using AI"""
     try:
-        # Find the document
-        document = await db_service.get_document_by_id(document_id)
-        if not document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        
-        # AI Extraction
-        ai_extraction = None
-        try:
-            # Pass document_type to AI extraction for better prompts/rules
-            ai_service = get_ai_service()
-            if ai_service:
-                ai_extraction = await ai_service.extract_document_information(
-                    document["images"],
-                    document.get("document_type", "unknown")
-                )
-            else:
-                ai_extraction = None
-        except Exception as e:
-            print(f"AI extraction failed: {e}")
-        
-        # Update document with extraction results
-        current_time = datetime.now().isoformat()
-        if ai_extraction:
-            if "ai_extraction" not in document:
-                document["ai_extraction"] = {}
-            document["ai_extraction"].update({
-                "extracted_text": ai_extraction.get("extracted_text", ""),
-                "confidence_score": ai_extraction.get("ai_confidence", 0.85),
-                "metadata": ai_extraction.get("metadata", {}),
-                "extracted_at": current_time,
-                "ai_model_used": "gemini-2.5-flash"
-            })
-            # Mark as processed by AI so dashboards can count it
-            document["status"] = "ai_processed"
-            document["updated_at"] = current_time
-        
-        return {
-            "success": True,
-            "message": "Document information extracted successfully",
-            "document_id": document_id,
-            "extracted_data": document.get("ai_extraction"),
-            "extracted_at": current_time
-        }
+        return await _extract_and_store(document_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -396,7 +455,7 @@ async def get_documents_stats_overview() -> Dict[str, Any]:
     """Return aggregate document stats for dashboards/portals."""
     try:
         # Get all documents from database
-        all_docs = await db_service.get_documents_by_citizen("all")
+        all_docs = await db_service.get_documents_by_citizen("all", DOCUMENT_STATS_COLUMNS)
         total_documents = len(all_docs)
         pending_statuses = {"submitted", "pending"}
         completed_statuses = {"approved"}
@@ -458,53 +517,18 @@ async def analyze_document_fraud(document_id: str) -> Dict[str, Any]:
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        # Get extracted data for fraud analysis
-        extracted_data = None
-        if document.get("ai_extraction"):
-            extracted_data = DocumentAnalysis(
-                document_type=document["document_type"],
-                extracted_text=document["ai_extraction"].get("extracted_text", ""),
-                confidence_score=document["ai_extraction"].get("confidence_score", 0.0),
-                metadata=document["ai_extraction"].get("metadata", {}),
-                validation_status="extracted"
-            )
-        else:
-            # Create basic analysis if no extraction data
-            extracted_data = DocumentAnalysis(
-                document_type=document["document_type"],
-                extracted_text=document.get("ai_analysis", {}).get("extracted_text", ""),
-                confidence_score=document.get("ai_analysis", {}).get("confidence_score", 0.0),
-                metadata=document.get("ai_analysis", {}).get("metadata", {}),
-                validation_status="pending"
-            )
-        
         # AI Fraud Analysis
-        fraud_analysis = None
-        try:
-            ai_service = get_ai_service()
-            if ai_service:
-                # Use extract_document_information for fraud analysis
-                fraud_analysis = await ai_service.extract_document_information(document["images"], document.get("document_type", "unknown"))
-            else:
-                fraud_analysis = None
-        except Exception as e:
-            print(f"AI fraud analysis failed: {e}")
-        
+        fraud_analysis = await _run_ai_stage(document, "fraud")
+
         # Update document with fraud analysis results
         current_time = datetime.now().isoformat()
         if fraud_analysis:
-            if "ai_fraud_analysis" not in document:
-                document["ai_fraud_analysis"] = {}
-            document["ai_fraud_analysis"].update({
-                "fraud_risk_level": fraud_analysis.metadata.get("fraud_analysis", {}).get("fraud_risk_level", "unknown"),
-                "fraud_indicators": fraud_analysis.metadata.get("fraud_analysis", {}).get("fraud_indicators", []),
-                "authenticity_score": fraud_analysis.metadata.get("fraud_analysis", {}).get("authenticity_score", 0.0),
-                "recommendations": fraud_analysis.metadata.get("fraud_analysis", {}).get("recommendations", []),
-                "summary": fraud_analysis.summary,
-                "analyzed_at": current_time,
-                "ai_model_used": "llama-3.1-405b"
-            })
+            fraud_analysis.setdefault("analyzed_at", current_time)
             document["updated_at"] = current_time
+            await db_service.update_document(document_id, {
+                "ai_fraud_analysis": document["ai_fraud_analysis"],
+                "updated_at": current_time
+            })
         
         return {
             "success": True,
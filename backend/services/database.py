@@ -1,152 +1,387 @@
-from supabase import create_client, Client
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+import httpx
+from supabase import create_async_client, AsyncClientOptions
 import os
 from dotenv import load_dotenv
+from typing import Dict, Optional, Tuple
+from services.document_store import create_document_store
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://mxrosjbwcfxygrrilpkq.supabase.co")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY", "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJlZiI6Im14cm9zamJ3Y2Z4eWdycmlscGtxIiwicm9sZSI6ImFub24iLCJpYXQiOjE3MzY1MDk1MjAsImV4cCI6MjA1MjA4NTUyMH0.example")
 
-# Create Supabase client with fallback to in-memory storage
-try:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("✅ Supabase connected successfully")
-except Exception as e:
-    print(f"⚠️ Supabase connection failed: {e}")
-    print("📝 Using in-memory storage as fallback")
-    supabase = None
+# One keep-alive pool shared by every PostgREST call
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=40)
+
+# Errors that mean a pooled keep-alive connection went stale; httpx drops that connection,
+# so the query is retried once on the same client (other in-flight queries keep using it)
+STALE_CONNECTION_ERRORS = (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)
+
+# Most rows sent in one multi-row INSERT when submissions arrive together
+SUPABASE_INSERT_BATCH = int(os.getenv("SUPABASE_INSERT_BATCH", "100"))
+
+# Columns the portal list views read; the AI result blobs stay behind until a document is opened.
+# Documents carry department_id/assigned_official_id (models/schemas.py); users carry department.
+DOCUMENT_LIST_COLUMNS = "id,citizen_id,user_id,document_type,department_id,assigned_official_id,status,description,images,created_at,updated_at"
+# The official and admin review lists render AI results and earlier reviews straight from each row
+DOCUMENT_REVIEW_COLUMNS = (
+    DOCUMENT_LIST_COLUMNS
+    + ",official_review_comment,official_reviewed_at,admin_review_comment,admin_reviewed_at"
+    + ",ai_analysis,ai_validation,ai_assessment,ai_extraction,ai_fraud_analysis"
+)
+# Columns the dashboard stats need (no images)
+DOCUMENT_STATS_COLUMNS = "id,status,created_at,updated_at,ai_extraction"
+
+# Seconds a department's official headcount is reused before it is re-counted
+ROSTER_TTL = 60
+
+# Cap on PostgREST requests in flight at once; extra queries wait for a slot
+SUPABASE_MAX_INFLIGHT = int(os.getenv("SUPABASE_MAX_INFLIGHT", "20"))
+
+_http_client = None
+supabase = None
+_connect_failed = False
+_connect_lock = asyncio.Lock()
+_inflight_slots = asyncio.Semaphore(SUPABASE_MAX_INFLIGHT)
+_inflight = 0
+
+
+def inflight_requests() -> int:
+    """Number of Supabase queries currently holding a slot"""
+    return _inflight
+
+
+async def get_supabase():
+    """Return the shared async Supabase client, connecting on first use (None if unavailable)"""
+    global _http_client, supabase, _connect_failed
+    if supabase is not None or _connect_failed:
+        return supabase
+    async with _connect_lock:
+        if supabase is None and not _connect_failed:
+            # Create Supabase client with fallback to local storage
+            try:
+                _http_client = httpx.AsyncClient(limits=HTTP_LIMITS)
+                supabase = await create_async_client(
+                    SUPABASE_URL, SUPABASE_KEY, AsyncClientOptions(httpx_client=_http_client)
+                )
+                logger.info("✅ Supabase connected successfully")
+            except Exception as e:
+                logger.warning("⚠️ Supabase connection failed, using local storage as fallback: %s", e)
+                await close_supabase()
+                _connect_failed = True
+    return supabase
+
+
+async def close_supabase():
+    """Drop the shared client and close its connection pool"""
+    global _http_client, supabase
+    client, _http_client, supabase = _http_client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+async def execute(build_query):
+    """Run build_query(client).execute(), retrying once if the pooled connection was stale"""
+    global _inflight
+    client = await get_supabase()
+    async with _inflight_slots:
+        _inflight += 1
+        try:
+            return await build_query(client).execute()
+        except STALE_CONNECTION_ERRORS:
+            return await build_query(client).execute()
+        finally:
+            _inflight -= 1
+
+
+class InsertBatcher:
+    """Coalesces concurrent inserts into one multi-row INSERT; a lone insert goes out immediately"""
+
+    def __init__(self, table: str, max_batch: int):
+        self.table = table
+        self.max_batch = max_batch
+        self._pending = []
+        self._drainer = None
+
+    async def insert(self, row: dict):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if self._drainer is None:
+            # Rows queued while an INSERT is in flight ride along with the next one
+            self._drainer = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        batch = []
+        try:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._run(batch)
+        finally:
+            self._drainer = None
+            # Stopped early (cancelled or crashed): nothing else would resolve these rows
+            stranded, self._pending = batch + self._pending, []
+            for _, future in stranded:
+                if not future.done():
+                    future.set_exception(RuntimeError("document insert batcher stopped"))
+
+    async def _run(self, batch):
+        rows = [row for row, _ in batch]
+        try:
+            # Rows may carry different keys; absent columns take their table defaults
+            result = await execute(lambda db: db.table(self.table).insert(rows, default_to_null=False))
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad row must not fail its neighbours; retry them one by one
+                await asyncio.gather(*(self._run([item]) for item in batch))
+                return
+            future = batch[0][1]
+            if not future.done():
+                future.set_exception(e)
+            return
+        inserted = {row.get("id"): row for row in result.data or ()}
+        for row, future in batch:
+            if not future.done():
+                future.set_result(inserted.get(row.get("id")))
+
+
+class TTLCache:
+    """Bounded LRU cache of Supabase rows with a time-to-live; hands out shallow copies"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, row = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(row)
+
+    def set(self, key, row: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, dict(row))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
 
 class DatabaseService:
     def __init__(self):
-        self.supabase = supabase
-        # In-memory storage as fallback
-        self.documents = []
+        # Local storage (SQLite or in-memory) as fallback
+        self.store = create_document_store()
+        # Rows read from Supabase; writes evict only the keys they touch
+        self._doc_cache = TTLCache(10_000, 60)
+        self._user_cache = TTLCache(10_000, 300)
+        self._document_inserts = InsertBatcher("documents", SUPABASE_INSERT_BATCH)
+        # department -> (counted at, number of officials); the roster rarely changes
+        self._roster: Dict[str, Tuple[float, int]] = {}
+    
+    def invalidate_roster(self, department: Optional[str]):
+        """Forget a department's cached official headcount"""
+        self._roster.pop(department, None)
+    
+    def _cache_user(self, user: dict):
+        self._user_cache.set(("id", user.get("id")), user)
+        self._user_cache.set(("email", user.get("email")), user)
     
     # User operations
     async def create_user(self, user_data: dict):
         """Create a new user"""
         try:
-            result = self.supabase.table("users").insert(user_data).execute()
-            return result.data[0] if result.data else None
+            result = await execute(lambda db: db.table("users").insert(user_data))
+            if not result.data:
+                return None
+            self._cache_user(result.data[0])
+            self.invalidate_roster(result.data[0].get("department"))
+            return result.data[0]
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.error("Error creating user: %s", e)
             return None
     
     async def get_user_by_email(self, email: str):
         """Get user by email"""
+        user = self._user_cache.get(("email", email))
+        if user is not None:
+            return user
         try:
-            result = self.supabase.table("users").select("*").eq("email", email).execute()
-            return result.data[0] if result.data else None
+            result = await execute(lambda db: db.table("users").select("*").eq("email", email))
+            if not result.data:
+                return None
+            self._cache_user(result.data[0])
+            return result.data[0]
         except Exception as e:
-            print(f"Error getting user: {e}")
+            logger.error("Error getting user: %s", e)
             return None
     
     async def get_user_by_id(self, user_id: str):
         """Get user by ID"""
+        user = self._user_cache.get(("id", user_id))
+        if user is not None:
+            return user
         try:
-            result = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            return result.data[0] if result.data else None
+            result = await execute(lambda db: db.table("users").select("*").eq("id", user_id))
+            if not result.data:
+                return None
+            self._cache_user(result.data[0])
+            return result.data[0]
         except Exception as e:
-            print(f"Error getting user: {e}")
+            logger.error("Error getting user: %s", e)
             return None
     
     # Document operations
     async def create_document(self, document_data: dict):
         """Create a new document"""
-        if self.supabase:
+        if await get_supabase():
             try:
-                result = self.supabase.table("documents").insert(document_data).execute()
-                return result.data[0] if result.data else None
+                document = await self._document_inserts.insert(document_data)
+                if document is not None:
+                    self._doc_cache.set(document["id"], document)
+                return document
             except Exception as e:
-                print(f"⚠️ Supabase error, falling back to in-memory storage: {e}")
-                # Fall back to in-memory storage
-                self.documents.append(document_data)
-                print(f"📝 Document saved to in-memory storage: {document_data['id']}")
-                return document_data
-        else:
-            # Use in-memory storage as fallback
-            self.documents.append(document_data)
-            print(f"📝 Document saved to in-memory storage: {document_data['id']}")
-            return document_data
-    
-    async def get_documents_by_citizen(self, citizen_id: str):
-        """Get documents by citizen ID"""
-        if self.supabase:
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        # Use local storage as fallback
+        await self.store.add(document_data)
+        logger.debug("📝 Document saved to local storage: %s", document_data["id"])
+        return document_data
+    
+    async def get_documents_by_citizen(self, citizen_id: str, columns: str = DOCUMENT_LIST_COLUMNS):
+        """Get documents by citizen ID ("all" returns every document)"""
+        if await get_supabase():
             try:
-                result = self.supabase.table("documents").select("*").eq("citizen_id", citizen_id).execute()
+                def citizen_query(db):
+                    query = db.table("documents").select(columns)
+                    return query if citizen_id == "all" else query.eq("citizen_id", citizen_id)
+                result = await execute(citizen_query)
                 return result.data if result.data else []
             except Exception as e:
-                print(f"⚠️ Supabase error, falling back to in-memory storage: {e}")
-                # Fall back to in-memory storage
-                if citizen_id == "all":
-                    return self.documents
-                else:
-                    return [doc for doc in self.documents if doc.get("citizen_id") == citizen_id]
-        else:
-            # Use in-memory storage as fallback
-            if citizen_id == "all":
-                return self.documents
-            else:
-                return [doc for doc in self.documents if doc.get("citizen_id") == citizen_id]
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        # Use local storage as fallback
+        if citizen_id == "all":
+            return await self.store.list()
+        return await self.store.list(citizen_id=citizen_id)
     
     async def get_documents_by_department(self, department: str):
         """Get documents by department"""
-        try:
-            result = self.supabase.table("documents").select("*").eq("department", department).execute()
-            return result.data if result.data else []
-        except Exception as e:
-            print(f"Error getting documents: {e}")
-            return []
+        if await get_supabase():
+            try:
+                result = await execute(lambda db: db.table("documents").select(DOCUMENT_LIST_COLUMNS).eq("department_id", department))
+                return result.data if result.data else []
+            except Exception as e:
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        return await self.store.list(department_id=department)
+    
+    async def get_documents_by_official(self, official_id: str):
+        """Get documents assigned to an official"""
+        if await get_supabase():
+            try:
+                result = await execute(lambda db: db.table("documents").select(DOCUMENT_LIST_COLUMNS).eq("assigned_official_id", official_id))
+                return result.data if result.data else []
+            except Exception as e:
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        return await self.store.list(assigned_official_id=official_id)
+    
+    async def get_documents_page(self, limit: int = 50, offset: int = 0, columns: str = DOCUMENT_LIST_COLUMNS, **filters):
+        """Get one page of documents matching the filters (only the given columns), plus the total match count"""
+        if await get_supabase():
+            try:
+                def page_query(db):
+                    query = db.table("documents").select(columns, count="exact")
+                    for column, value in filters.items():
+                        query = query.eq(column, value)
+                    return query.order("created_at").range(offset, offset + limit - 1)
+                result = await execute(page_query)
+                return result.data or [], result.count or 0
+            except Exception as e:
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        # Local rows are trimmed to the same columns so both backends return the same shape
+        documents, total = await self.store.page(limit, offset, **filters)
+        keep = columns.split(",")
+        return [{column: document.get(column) for column in keep} for document in documents], total
     
     async def get_document_by_id(self, document_id: str):
         """Get a specific document by ID"""
-        if self.supabase:
+        document = self._doc_cache.get(document_id)
+        if document is not None:
+            return document
+        if await get_supabase():
             try:
-                result = self.supabase.table("documents").select("*").eq("id", document_id).execute()
+                result = await execute(lambda db: db.table("documents").select("*").eq("id", document_id))
+                if not result.data:
+                    return None
+                self._doc_cache.set(document_id, result.data[0])
+                return result.data[0]
+            except Exception as e:
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        # Use local storage as fallback
+        return await self.store.get(document_id)
+    
+    async def update_document(self, document_id: str, updates: dict):
+        """Persist a partial update to a document"""
+        self._doc_cache.pop(document_id)
+        if await get_supabase():
+            try:
+                result = await execute(lambda db: db.table("documents").update(updates).eq("id", document_id))
                 return result.data[0] if result.data else None
             except Exception as e:
-                print(f"⚠️ Supabase error, falling back to in-memory storage: {e}")
-                # Fall back to in-memory storage
-                return next((doc for doc in self.documents if doc.get("id") == document_id), None)
-        else:
-            # Use in-memory storage as fallback
-            return next((doc for doc in self.documents if doc.get("id") == document_id), None)
+                logger.warning("⚠️ Supabase error, falling back to local storage: %s", e)
+        return await self.store.update(document_id, updates)
     
     async def update_document_status(self, document_id: str, status: str, assigned_official: str = None):
         """Update document status"""
+        self._doc_cache.pop(document_id)
         try:
             update_data = {"status": status, "updated_at": "now()"}
             if assigned_official:
-                update_data["assigned_official"] = assigned_official
+                update_data["assigned_official_id"] = assigned_official
             
-            result = self.supabase.table("documents").update(update_data).eq("id", document_id).execute()
+            result = await execute(lambda db: db.table("documents").update(update_data).eq("id", document_id))
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error updating document: {e}")
+            logger.error("Error updating document: %s", e)
             return None
     
     # Department operations
     async def get_department_info(self, department: str):
         """Get department information"""
         try:
-            result = self.supabase.table("departments").select("*").eq("id", department).execute()
+            result = await execute(lambda db: db.table("departments").select("*").eq("id", department))
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting department: {e}")
+            logger.error("Error getting department: %s", e)
             return None
     
     async def get_workload_stats(self, department: str):
         """Get workload statistics for a department"""
         try:
-            # Get total officials in department
-            officials_result = self.supabase.table("users").select("id").eq("department", department).eq("role", "official").execute()
-            total_officials = len(officials_result.data) if officials_result.data else 0
-            
-            # Get available officials (not assigned to documents)
-            assigned_result = self.supabase.table("documents").select("assigned_official").eq("department", department).in_("status", ["pending", "in_review"]).execute()
-            assigned_officials = set([doc["assigned_official"] for doc in assigned_result.data if doc["assigned_official"]])
-            available_officials = total_officials - len(assigned_officials)
+            # Counted server-side (supabase/migrations); the headcount comes from the roster while fresh
+            counted_at, total_officials = self._roster.get(department, (0.0, 0))
+            if time.monotonic() - counted_at < ROSTER_TTL:
+                result = await execute(lambda db: db.rpc("assigned_officials", {"dept": department}))
+                assigned = result.data or 0
+            else:
+                result = await execute(lambda db: db.rpc("workload_stats", {"dept": department}))
+                row = result.data[0] if result.data else {}
+                total_officials = row.get("total") or 0
+                assigned = row.get("assigned") or 0
+                self._roster[department] = (time.monotonic(), total_officials)
+            available_officials = total_officials - assigned
             
             utilization_percentage = ((total_officials - available_officials) / total_officials * 100) if total_officials > 0 else 0
             
@@ -158,7 +393,7 @@ class DatabaseService:
                 "average_utilization": round(utilization_percentage, 2)
             }
         except Exception as e:
-            print(f"Error getting workload stats: {e}")
+            logger.error("Error getting workload stats: %s", e)
             return {
                 "total_officials": 0,
                 "available_officials": 0,
@@ -170,15 +405,9 @@ class DatabaseService:
     async def get_document_queue_stats(self, department: str):
         """Get document queue statistics for a department"""
         try:
-            result = self.supabase.table("documents").select("status").eq("department", department).execute()
-            
-            if not result.data:
-                return {"pending": 0, "in_review": 0, "completed": 0, "escalated": 0}
-            
-            status_counts = {}
-            for doc in result.data:
-                status = doc["status"]
-                status_counts[status] = status_counts.get(status, 0) + 1
+            # Rows arrive already grouped by status (supabase/migrations/*_queue_stats.sql)
+            result = await execute(lambda db: db.table("queue_stats").select("status,n").eq("department_id", department))
+            status_counts = {row["status"]: row["n"] for row in result.data or ()}
             
             return {
                 "pending": status_counts.get("pending", 0),
@@ -187,7 +416,7 @@ class DatabaseService:
                 "escalated": status_counts.get("escalated", 0)
             }
         except Exception as e:
-            print(f"Error getting queue stats: {e}")
+            logger.error("Error getting queue stats: %s", e)
             return {"pending": 0, "in_review": 0, "completed": 0, "escalated": 0}
 
 # Global database service instance
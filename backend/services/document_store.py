@@ -0,0 +1,237 @@
+"""
+Local document storage used when Supabase is unavailable
+Provides an in-memory store and a persistent SQLite store with the same interface
+"""
+
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.schemas import Document
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> str:
+        return orjson.dumps(value).decode("utf-8")
+
+    loads = orjson.loads
+except ImportError:
+    dumps = json.dumps
+    loads = json.loads
+
+try:
+    import aiosqlite
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+# Columns that are copied out of the document payload so they can be indexed
+INDEXED_COLUMNS = ("citizen_id", "document_type", "department_id", "assigned_official_id", "status", "created_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    citizen_id TEXT,
+    document_type TEXT,
+    department_id TEXT,
+    assigned_official_id TEXT,
+    status TEXT,
+    created_at TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_citizen_idx ON documents(citizen_id);
+CREATE INDEX IF NOT EXISTS documents_department_idx ON documents(department_id);
+CREATE INDEX IF NOT EXISTS documents_official_idx ON documents(assigned_official_id);
+CREATE INDEX IF NOT EXISTS documents_status_idx ON documents(status);
+CREATE TABLE IF NOT EXISTS document_images (
+    document_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (document_id, idx)
+);
+"""
+
+
+class InMemoryDocumentStore:
+    """Process-local document storage (contents are lost on restart)"""
+
+    def __init__(self):
+        # Documents are held as slotted records and turned into dicts on the way out
+        self.documents: List[Document] = []
+        # Hash indexes so id and citizen lookups skip the full scan
+        self._by_id: Dict[str, Document] = {}
+        self._by_citizen: Dict[str, List[Document]] = defaultdict(list)
+        # Serializes mutations so concurrent requests never interleave partial updates
+        self._lock = asyncio.Lock()
+
+    def _find(self, document_id: str) -> Optional[Document]:
+        return self._by_id.get(document_id)
+
+    def _matching(self, filters: Dict[str, Any]) -> List[Document]:
+        candidates = self.documents
+        if "citizen_id" in filters:
+            filters = dict(filters)
+            candidates = self._by_citizen.get(filters.pop("citizen_id"), [])
+        if not filters:
+            return candidates
+        return [
+            doc for doc in candidates
+            if all(getattr(doc, column) == value for column, value in filters.items())
+        ]
+
+    async def add(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._lock:
+            record = Document.from_dict(document)
+            self.documents.append(record)
+            self._by_id[record.id] = record
+            self._by_citizen[record.citizen_id].append(record)
+        return document
+
+    async def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        document = self._find(document_id)
+        return document.to_dict() if document else None
+
+    async def list(self, **filters) -> List[Dict[str, Any]]:
+        return [doc.to_dict() for doc in self._matching(filters)]
+
+    async def page(self, limit: int, offset: int, **filters) -> Tuple[List[Dict[str, Any]], int]:
+        matching = self._matching(filters)
+        return [doc.to_dict() for doc in matching[offset:offset + limit]], len(matching)
+
+    async def update(self, document_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            document = self._find(document_id)
+            if document is None:
+                return None
+            citizen_id = document.citizen_id
+            document.update(updates)
+            if document.citizen_id != citizen_id:
+                self._by_citizen[citizen_id].remove(document)
+                self._by_citizen[document.citizen_id].append(document)
+        return document.to_dict()
+
+
+class SQLiteDocumentStore:
+    """SQLite document storage in WAL mode with indexes on the filter columns"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        self._connect_lock = asyncio.Lock()
+        # The connection is shared, so multi-statement writes must not interleave
+        self._write_lock = asyncio.Lock()
+
+    async def _connection(self):
+        """Open the database on first use and make sure the schema exists"""
+        if self._db is None:
+            async with self._connect_lock:
+                if self._db is None:
+                    db = await aiosqlite.connect(self.path)
+                    db.row_factory = aiosqlite.Row
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    await db.executescript(SCHEMA)
+                    await db.commit()
+                    self._db = db
+        return self._db
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def _write(self, db, document: Dict[str, Any], write_images: bool = True):
+        """Insert or replace a document row and optionally its images (caller commits)"""
+        payload = {key: value for key, value in document.items() if key != "images"}
+        await db.execute(
+            "INSERT OR REPLACE INTO documents (id, citizen_id, document_type, department_id, "
+            "assigned_official_id, status, created_at, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (document["id"], *(document.get(column) for column in INDEXED_COLUMNS), dumps(payload))
+        )
+        if not write_images:
+            return
+        await db.execute("DELETE FROM document_images WHERE document_id = ?", (document["id"],))
+        await db.executemany(
+            "INSERT INTO document_images (document_id, idx, data) VALUES (?, ?, ?)",
+            [(document["id"], idx, image) for idx, image in enumerate(document.get("images") or [])]
+        )
+
+    async def _load(self, db, rows) -> List[Dict[str, Any]]:
+        """Rebuild documents from their rows, attaching images with a single query"""
+        documents = {row["id"]: loads(row["payload"]) for row in rows}
+        for document in documents.values():
+            document["images"] = []
+        if documents:
+            placeholders = ",".join("?" * len(documents))
+            async with db.execute(
+                f"SELECT document_id, data FROM document_images WHERE document_id IN ({placeholders}) "
+                "ORDER BY document_id, idx",
+                tuple(documents)
+            ) as cursor:
+                async for row in cursor:
+                    documents[row["document_id"]]["images"].append(row["data"])
+        return list(documents.values())
+
+    async def add(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        db = await self._connection()
+        async with self._write_lock:
+            await self._write(db, document)
+            await db.commit()
+        return document
+
+    async def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        db = await self._connection()
+        async with db.execute("SELECT id, payload FROM documents WHERE id = ?", (document_id,)) as cursor:
+            rows = await cursor.fetchall()
+        documents = await self._load(db, rows)
+        return documents[0] if documents else None
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> str:
+        for column in filters:
+            if column not in INDEXED_COLUMNS:
+                raise ValueError(f"Cannot filter documents by {column}")
+        if not filters:
+            return ""
+        return " WHERE " + " AND ".join(f"{column} = ?" for column in filters)
+
+    async def list(self, **filters) -> List[Dict[str, Any]]:
+        query = "SELECT id, payload FROM documents" + self._where(filters) + " ORDER BY created_at"
+        db = await self._connection()
+        async with db.execute(query, tuple(filters.values())) as cursor:
+            rows = await cursor.fetchall()
+        return await self._load(db, rows)
+
+    async def page(self, limit: int, offset: int, **filters) -> Tuple[List[Dict[str, Any]], int]:
+        where = self._where(filters)
+        db = await self._connection()
+        async with db.execute("SELECT COUNT(*) FROM documents" + where, tuple(filters.values())) as cursor:
+            (total,) = await cursor.fetchone()
+        async with db.execute(
+            "SELECT id, payload FROM documents" + where + " ORDER BY created_at LIMIT ? OFFSET ?",
+            (*filters.values(), limit, offset)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return await self._load(db, rows), total
+
+    async def update(self, document_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        db = await self._connection()
+        async with self._write_lock:
+            document = await self.get(document_id)
+            if document is None:
+                return None
+            document.update(updates)
+            await self._write(db, document, write_images="images" in updates)
+            await db.commit()
+        return document
+
+
+def create_document_store():
+    """Use SQLite when LOCAL_DB_PATH is set (the default), otherwise keep documents in memory"""
+    path = os.getenv("LOCAL_DB_PATH", "publicpulse_local.db")
+    if path and SQLITE_AVAILABLE:
+        return SQLiteDocumentStore(path)
+    return InMemoryDocumentStore()
@@ -0,0 +1,25 @@
+"""
+Uvicorn settings shared by the entry points
+"""
+
+import os
+
+
+def server_options() -> dict:
+    """Fastest event loop and HTTP parser that are installed (uvloop is not available on Windows)"""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    return {"loop": loop, "http": http}
+
+
+def worker_count(default: int = 1) -> int:
+    """Worker processes from WEB_CONCURRENCY; each worker keeps its own in-memory state"""
+    return int(os.environ.get("WEB_CONCURRENCY", default))
@@ -5,6 +5,7 @@ Railway deployment entry point for PublicPulse backend
 import os
 import uvicorn
 from app.main import app
+from serving import server_options, worker_count
 
 def main():
     """Main entry point for Railway deployment"""
@@ -12,13 +13,19 @@ def main():
     port = int(os.environ.get("PORT", 8000))
     host = os.environ.get("HOST", "0.0.0.0")
     
-    print(f"🚀 Starting PublicPulse API on {host}:{port}")
+    # Worker processes; each keeps its own in-memory caches, so scale out deliberately
+    workers = worker_count()
+    options = server_options()
+    
+    print(f"🚀 Starting PublicPulse API on {host}:{port} ({workers} worker(s), {options['loop']}/{options['http']})")
     
     # Run the application
     uvicorn.run(
         "app.main:app",
         host=host,
         port=port,
+        workers=workers,
+        **options,
         reload=False,  # Disable reload in production
         log_level="info"
     )
@@ -0,0 +1,16 @@
+-- Officials in a department and how many of them hold open documents, in one round trip
+create or replace function workload_stats(dept text)
+returns table(total int, assigned int)
+language sql
+stable
+as $$
+    select
+        (select count(*)::int
+           from users
+          where department = dept and role = 'official'),
+        (select count(distinct assigned_official_id)::int
+           from documents
+          where department_id = dept
+            and status in ('pending', 'in_review')
+            and assigned_official_id is not null)
+$$;
@@ -0,0 +1,9 @@
+-- Per-department document counts by status, aggregated in Postgres.
+-- The index also carries assigned_official_id so workload_stats counts officials from the index alone.
+create index if not exists documents_department_status_idx
+    on documents (department_id, status) include (assigned_official_id);
+
+create or replace view queue_stats as
+    select department_id, status, count(*)::int as n
+      from documents
+     group by department_id, status;
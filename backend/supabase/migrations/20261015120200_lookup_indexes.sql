@@ -0,0 +1,11 @@
+-- Indexes behind every equality filter DatabaseService sends to PostgREST.
+-- Plain (non-concurrent) builds: migrations run inside a transaction.
+create index if not exists users_email_idx on users (email);
+create index if not exists documents_citizen_idx on documents (citizen_id);
+create index if not exists documents_official_idx on documents (assigned_official_id);
+
+-- documents (department_id, status) is covered by the queue_stats migration
+
+-- Only officials are ever counted per department
+create index if not exists users_department_officials_idx
+    on users (department) where role = 'official';
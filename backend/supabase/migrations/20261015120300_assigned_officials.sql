@@ -0,0 +1,12 @@
+-- Busy officials only; used while the department roster size is cached in the API
+create or replace function assigned_officials(dept text)
+returns int
+language sql
+stable
+as $$
+    select count(distinct assigned_official_id)::int
+      from documents
+     where department_id = dept
+       and status in ('pending', 'in_review')
+       and assigned_official_id is not null
+$$;
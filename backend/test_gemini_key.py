@@ -4,9 +4,21 @@ Test script to check if the provided Gemini API key is working
 """
 
 import asyncio
+import base64
 import json
+from functools import lru_cache
 import google.generativeai as genai
 
+# Simple test image, decoded once at import
+_TEST_IMG_B64 = "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAYEBQYFBAYGBQYHBwYIChAKCgkJChQODwwQFxQYGBcUFhYaHSUfGhsjHBYWICwgIyYnKSopGR8tMC0oMCUoKSj/2wBDAQcHBwoIChMKChMoGhYaKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCj/wAARCAABAAEDASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAv/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQABAQAAAAAAAAAAAAAAAAAAAAX/xAAUEQEAAAAAAAAAAAAAAAAAAAAA/9oADAMBAAIRAxEAPwCdABmX/9k="
+_TEST_IMG_BYTES = base64.b64decode(_TEST_IMG_B64)
+
+@lru_cache(maxsize=4)
+def _get_model(api_key: str, name: str = "gemini-1.5-flash") -> genai.GenerativeModel:
+    """Configure Gemini and build the model once per key, reused by later checks"""
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(name)
+
 async def test_gemini_api_key():
     """Test the provided Gemini API key"""
     
@@ -20,39 +32,32 @@ async def test_gemini_api_key():
     
     try:
         # Configure Gemini
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = _get_model(api_key)
         
-        # Test with a simple text prompt
-        print("1. Testing with text prompt...")
-        response = await asyncio.to_thread(
-            model.generate_content,
-            "Hello, this is a test. Please respond with 'API key is working' if you can see this message."
+        # The text and image checks are independent, so both requests go out together
+        text_response, image_response = await asyncio.gather(
+            model.generate_content_async(
+                "Hello, this is a test. Please respond with 'API key is working' if you can see this message."
+            ),
+            model.generate_content_async(
+                [
+                    "Analyze this image and tell me what you see. Return JSON with: document_type, extracted_text, confidence_score",
+                    {
+                        "mime_type": "image/jpeg",
+                        "data": _TEST_IMG_BYTES
+                    }
+                ]
+            )
         )
         
-        print(f"   Response: {response.text}")
+        # Test with a simple text prompt
+        print("1. Testing with text prompt...")
+        print(f"   Response: {text_response.text}")
         print("   ✅ Text generation working!")
         print()
         
-        # Test with image (using a simple base64 test image)
         print("2. Testing with image analysis...")
-        test_image = "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAYEBQYFBAYGBQYHBwYIChAKCgkJChQODwwQFxQYGBcUFhYaHSUfGhsjHBYWICwgIyYnKSopGR8tMC0oMCUoKSj/2wBDAQcHBwoIChMKChMoGhYaKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCj/wAARCAABAAEDASIAAhEBAxEB/8QAFQABAQAAAAAAAAAAAAAAAAAAAAv/xAAUEAEAAAAAAAAAAAAAAAAAAAAA/8QAFQABAQAAAAAAAAAAAAAAAAAAAAX/xAAUEQEAAAAAAAAAAAAAAAAAAAAA/9oADAMBAAIRAxEAPwCdABmX/9k="
-        
-        # Remove data URL prefix
-        img_data = test_image.split(',')[1]
-        
-        response = await asyncio.to_thread(
-            model.generate_content,
-            [
-                "Analyze this image and tell me what you see. Return JSON with: document_type, extracted_text, confidence_score",
-                {
-                    "mime_type": "image/jpeg",
-                    "data": img_data
-                }
-            ]
-        )
-        
-        print(f"   Response: {response.text}")
+        print(f"   Response: {image_response.text}")
         print("   ✅ Image analysis working!")
         print()
         
@@ -7,12 +7,26 @@ The new backend is located in backend/app/main.py
 import sys
 import os
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
 
-# Import and run the new backend
-from app.main import app
+# Import and run the new backend; backend/ only goes on the path when it is not importable already
+try:
+    from app.main import app
+except ImportError:
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import app
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    from serving import server_options
+    # Development server: auto-reload needs the import string, and reload implies one process.
+    # Only the backend tree is watched, not the frontend and docs alongside it.
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        reload_dirs=[BACKEND_DIR],
+        app_dir=BACKEND_DIR,
+        **server_options()
+    )
@@ -6,41 +6,148 @@ This script shows what AI analysis results look like
 
 import asyncio
 import json
+import os
 import random
+import sys
+import time
 from datetime import datetime
-from typing import Dict, Any, List
+from functools import lru_cache
+from dataclasses import asdict, dataclass
+from typing import Dict, Any, List, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def pretty_json(data: Any) -> str:
+    """Indented JSON for the demo output (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+# Simulated stage delays are off by default (SIMULATE_LATENCY=1 or --realistic-timing turns them on)
+SIMULATE_LATENCY = os.getenv("SIMULATE_LATENCY", "0") == "1"
+
+# Mock data tables are built once at import and shared read-only between calls
+_MOCK_NAMES = {
+    "national_id": "John Doe",
+    "drivers_license": "Jane Smith",
+    "passport": "Michael Johnson",
+    "birth_certificate": "Sarah Wilson",
+    "marriage_certificate": "Robert Brown",
+    "other": "Alice Davis"
+}
+
+@dataclass(slots=True, frozen=True)
+class NationalIdInfo:
+    """Fields read from a national ID"""
+    full_name: str
+    national_id: str
+    date_of_birth: str
+    place_of_birth: str
+    gender: str
+    address: str
+    issue_date: str
+    expiry_date: str
+
+@dataclass(slots=True, frozen=True)
+class DriversLicenseInfo:
+    """Fields read from a driver's license"""
+    full_name: str
+    license_number: str
+    date_of_birth: str
+    license_class: str
+    issue_date: str
+    expiry_date: str
+    address: str
+
+@dataclass(slots=True, frozen=True)
+class PassportInfo:
+    """Fields read from a passport"""
+    full_name: str
+    passport_number: str
+    date_of_birth: str
+    place_of_birth: str
+    nationality: str
+    issue_date: str
+    expiry_date: str
+
+@dataclass(slots=True, frozen=True)
+class OtherDocumentInfo:
+    """Fields read from any other document type"""
+    full_name: str = "Alice Davis"
+    document_type: str = "other"
+    extracted_text: str = "Sample extracted text from document"
+    confidence: float = 0.85
+
+BasicInfo = Union[NationalIdInfo, DriversLicenseInfo, PassportInfo, OtherDocumentInfo]
+
+_BASIC_INFO_TABLE: Dict[str, BasicInfo] = {
+    "national_id": NationalIdInfo(
+        full_name="John Doe",
+        national_id="1234567890",
+        date_of_birth="1990-01-15",
+        place_of_birth="Kampala",
+        gender="Male",
+        address="123 Main Street, Kampala",
+        issue_date="2020-01-15",
+        expiry_date="2030-01-15"
+    ),
+    "drivers_license": DriversLicenseInfo(
+        full_name="Jane Smith",
+        license_number="DL123456789",
+        date_of_birth="1985-05-20",
+        license_class="B",
+        issue_date="2020-01-15",
+        expiry_date="2025-01-15",
+        address="456 Oak Avenue, Kampala"
+    ),
+    "passport": PassportInfo(
+        full_name="Michael Johnson",
+        passport_number="P123456789",
+        date_of_birth="1988-03-10",
+        place_of_birth="Kampala",
+        nationality="Ugandan",
+        issue_date="2020-01-15",
+        expiry_date="2030-01-15"
+    )
+}
+
+_DEFAULT_RECS = (
+    "Document quality is good",
+    "All required information is visible",
+    "No signs of tampering detected",
+    "Image resolution is adequate for processing"
+)
 
 class MockAIService:
     """Mock AI service to demonstrate output results"""
     
-    def __init__(self):
+    def __init__(self, realistic_timing: bool = False):
+        self.realistic_timing = realistic_timing
         self.processing_times = {
             "extraction": 2.0,
             "quality_analysis": 1.5,
             "fraud_detection": 1.0,
             "name_extraction": 0.5
         }
+        # Private generator for the mock scores
+        self._rng = random.Random()
     
     async def extract_name_from_document(self, images: List[str], document_type: str) -> Dict[str, Any]:
         """Extract citizen name from document images"""
         print(f"🤖 AI Processing: Extracting name from {document_type} document...")
-        await asyncio.sleep(self.processing_times["name_extraction"])
+        await self._simulate_work(self.processing_times["name_extraction"])
         
         # Mock name extraction
-        names = {
-            "national_id": "John Doe",
-            "drivers_license": "Jane Smith", 
-            "passport": "Michael Johnson",
-            "birth_certificate": "Sarah Wilson",
-            "marriage_certificate": "Robert Brown",
-            "other": "Alice Davis"
-        }
-        extracted_name = names.get(document_type, "Unknown Person")
+        extracted_name = _MOCK_NAMES.get(document_type, "Unknown Person")
         
         result = {
             "success": True,
             "extracted_name": extracted_name,
-            "confidence": random.uniform(0.85, 0.95),
+            "confidence": self._rng.uniform(0.85, 0.95),
             "processing_time": f"{self.processing_times['name_extraction']:.2f}s",
             "extracted_at": datetime.now().isoformat()
         }
@@ -52,24 +159,16 @@ class MockAIService:
         """Extract comprehensive information from document images"""
         print(f"🤖 AI Processing: Comprehensive document extraction for {document_type}...")
         
-        start_time = datetime.now()
-        
-        # Step 1: Extract basic information
-        await asyncio.sleep(self.processing_times["extraction"] * 0.4)
-        basic_info = self._extract_basic_info(document_type)
-        print("📄 Step 1: Basic information extracted")
+        start_ns = time.perf_counter_ns()
         
-        # Step 2: Quality analysis
-        await asyncio.sleep(self.processing_times["quality_analysis"] * 0.3)
-        quality_analysis = await self._analyze_document_quality(images)
-        print("🔍 Step 2: Quality analysis completed")
+        # The three steps are independent, so they run concurrently
+        basic_info, quality_analysis, fraud_analysis = await asyncio.gather(
+            self._run_basic_extraction(document_type),
+            self._analyze_document_quality(images),
+            self._detect_fraud(images, document_type)
+        )
         
-        # Step 3: Fraud detection
-        await asyncio.sleep(self.processing_times["fraud_detection"] * 0.3)
-        fraud_analysis = await self._detect_fraud(images, document_type)
-        print("🛡️ Step 3: Fraud detection completed")
-        
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
         
         result = {
             "success": True,
@@ -86,68 +185,45 @@ class MockAIService:
         print(f"✅ Document extraction completed in {processing_time:.2f}s")
         return result
     
-    def _extract_basic_info(self, document_type: str) -> Dict[str, Any]:
-        """Extract basic information based on document type"""
-        if document_type == "national_id":
-            return {
-                "full_name": "John Doe",
-                "national_id": "1234567890",
-                "date_of_birth": "1990-01-15",
-                "place_of_birth": "Kampala",
-                "gender": "Male",
-                "address": "123 Main Street, Kampala",
-                "issue_date": "2020-01-15",
-                "expiry_date": "2030-01-15"
-            }
-        elif document_type == "drivers_license":
-            return {
-                "full_name": "Jane Smith",
-                "license_number": "DL123456789",
-                "date_of_birth": "1985-05-20",
-                "license_class": "B",
-                "issue_date": "2020-01-15",
-                "expiry_date": "2025-01-15",
-                "address": "456 Oak Avenue, Kampala"
-            }
-        elif document_type == "passport":
-            return {
-                "full_name": "Michael Johnson",
-                "passport_number": "P123456789",
-                "date_of_birth": "1988-03-10",
-                "place_of_birth": "Kampala",
-                "nationality": "Ugandan",
-                "issue_date": "2020-01-15",
-                "expiry_date": "2030-01-15"
-            }
-        else:
-            return {
-                "full_name": "Alice Davis",
-                "document_type": document_type,
-                "extracted_text": "Sample extracted text from document",
-                "confidence": 0.85
-            }
+    async def _simulate_work(self, seconds: float):
+        """Sleep for the simulated stage time, only when realistic timing is on"""
+        if self.realistic_timing:
+            await asyncio.sleep(seconds)
+    
+    async def _run_basic_extraction(self, document_type: str) -> BasicInfo:
+        """Step 1: extract basic information"""
+        await self._simulate_work(self.processing_times["extraction"] * 0.4)
+        basic_info = self._extract_basic_info(document_type)
+        print("📄 Step 1: Basic information extracted")
+        return basic_info
+    
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _extract_basic_info(document_type: str) -> BasicInfo:
+        """Extract basic information based on document type (memoized, immutable)"""
+        template = _BASIC_INFO_TABLE.get(document_type)
+        if template is not None:
+            return template
+        return OtherDocumentInfo(document_type=document_type)
     
     async def _analyze_document_quality(self, images: List[str]) -> Dict[str, Any]:
-        """Analyze document quality"""
-        await asyncio.sleep(0.5)
+        """Step 2: analyze document quality"""
+        await self._simulate_work(0.5 + self.processing_times["quality_analysis"] * 0.3)
+        print("🔍 Step 2: Quality analysis completed")
         
         return {
-            "quality_score": random.uniform(0.7, 0.95),
-            "confidence": random.uniform(0.8, 0.95),
-            "recommendations": [
-                "Document quality is good",
-                "All required information is visible",
-                "No signs of tampering detected",
-                "Image resolution is adequate for processing"
-            ]
+            "quality_score": self._rng.uniform(0.7, 0.95),
+            "confidence": self._rng.uniform(0.8, 0.95),
+            "recommendations": _DEFAULT_RECS
         }
     
     async def _detect_fraud(self, images: List[str], document_type: str) -> Dict[str, Any]:
-        """Detect potential fraud indicators"""
-        await asyncio.sleep(0.5)
+        """Step 3: detect potential fraud indicators"""
+        await self._simulate_work(0.5 + self.processing_times["fraud_detection"] * 0.3)
+        print("🛡️ Step 3: Fraud detection completed")
         
         # Simulate fraud detection
-        fraud_risk = random.uniform(0.1, 0.3)
+        fraud_risk = self._rng.uniform(0.1, 0.3)
         issues = []
         
         if fraud_risk > 0.7:
@@ -162,58 +238,79 @@ class MockAIService:
             "issues": issues
         }
 
-async def demonstrate_ai_outputs():
+# Most documents analyzed at once
+MAX_CONCURRENCY = 8
+
+async def analyze_document(ai_service: MockAIService, slots: asyncio.Semaphore, images: List[str], document_type: str):
+    """Run name extraction and full extraction for one document concurrently"""
+    async with slots:
+        return await asyncio.gather(
+            ai_service.extract_name_from_document(images, document_type),
+            ai_service.extract_document_information(images, document_type)
+        )
+
+async def demonstrate_ai_outputs(realistic_timing: bool = False):
     """Demonstrate AI output results"""
     print("🚀 PublicPulse AI Output Results Demonstration")
     print("=" * 60)
     
-    ai_service = MockAIService()
+    ai_service = MockAIService(realistic_timing)
     
     # Test different document types
     document_types = ["national_id", "drivers_license", "passport", "birth_certificate"]
     
-    for doc_type in document_types:
-        print(f"\n📋 Processing {doc_type.upper()} Document")
-        print("-" * 40)
-        
-        # Simulate document images (empty list for demo)
-        images = ["mock_image_data_1", "mock_image_data_2"]
+    # Simulate document images (empty list for demo)
+    images = ["mock_image_data_1", "mock_image_data_2"]
+    
+    # The documents are unrelated, so they are analyzed together and reported in order;
+    # the task group cancels the rest if one analysis fails
+    slots = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(analyze_document(ai_service, slots, images, doc_type)) for doc_type in document_types]
+    results = [task.result() for task in tasks]
+    
+    out: List[str] = []
+    for doc_type, (name_result, extraction_result) in zip(document_types, results):
+        out.append(f"\n📋 Processing {doc_type.upper()} Document")
+        out.append("-" * 40)
         
         # 1. Name extraction (background process)
-        print("\n1️⃣ Name Extraction (Background Process):")
-        name_result = await ai_service.extract_name_from_document(images, doc_type)
-        print(f"   Result: {json.dumps(name_result, indent=2)}")
+        out.append("\n1️⃣ Name Extraction (Background Process):")
+        out.append(f"   Result: {pretty_json(name_result)}")
         
         # 2. Comprehensive document extraction
-        print("\n2️⃣ Comprehensive Document Extraction:")
-        extraction_result = await ai_service.extract_document_information(images, doc_type)
+        out.append("\n2️⃣ Comprehensive Document Extraction:")
         
-        print("\n📊 AI Analysis Results:")
-        print(f"   ✅ Success: {extraction_result['success']}")
-        print(f"   📄 Document Type: {doc_type}")
-        print(f"   🎯 AI Confidence: {extraction_result['ai_confidence']:.2%}")
-        print(f"   📈 Quality Score: {extraction_result['ai_quality_score']:.2%}")
-        print(f"   🛡️ Fraud Risk: {extraction_result['ai_fraud_risk']:.2%}")
-        print(f"   ⏱️ Processing Time: {extraction_result['ai_processing_time']}")
+        out.append("\n📊 AI Analysis Results:")
+        out.append(f"   ✅ Success: {extraction_result['success']}")
+        out.append(f"   📄 Document Type: {doc_type}")
+        out.append(f"   🎯 AI Confidence: {extraction_result['ai_confidence']:.2%}")
+        out.append(f"   📈 Quality Score: {extraction_result['ai_quality_score']:.2%}")
+        out.append(f"   🛡️ Fraud Risk: {extraction_result['ai_fraud_risk']:.2%}")
+        out.append(f"   ⏱️ Processing Time: {extraction_result['ai_processing_time']}")
         
-        print("\n📝 Extracted Data:")
-        for key, value in extraction_result['extracted_data'].items():
-            print(f"   {key}: {value}")
+        out.append("\n📝 Extracted Data:")
+        for key, value in asdict(extraction_result['extracted_data']).items():
+            out.append(f"   {key}: {value}")
         
-        print("\n💡 AI Recommendations:")
+        out.append("\n💡 AI Recommendations:")
         for rec in extraction_result['ai_recommendations']:
-            print(f"   • {rec}")
+            out.append(f"   • {rec}")
         
-        print("\n⚠️ AI Issues:")
+        out.append("\n⚠️ AI Issues:")
         for issue in extraction_result['ai_issues']:
-            print(f"   • {issue}")
+            out.append(f"   • {issue}")
         
-        print("\n" + "=" * 60)
+        out.append("\n" + "=" * 60)
+    
+    # The report is emitted in one write instead of one print per line
+    sys.stdout.write("\n".join(out) + "\n")
 
 def show_frontend_display():
     """Show how AI results are displayed in the frontend"""
-    print("\n🖥️ Frontend Display Examples:")
-    print("=" * 60)
+    out: List[str] = []
+    out.append("\n🖥️ Frontend Display Examples:")
+    out.append("=" * 60)
     
     # Example AI results that would be displayed in components
     ai_results = {
@@ -240,23 +337,25 @@ def show_frontend_display():
         ]
     }
     
-    print("📱 Admin Dashboard Display:")
-    print(f"   Document Type: {ai_results['document_type']}")
-    print(f"   Confidence: {ai_results['ai_confidence']:.0%}")
-    print(f"   Quality Score: {ai_results['ai_quality_score']:.0%}")
-    print(f"   Fraud Risk: {ai_results['ai_fraud_risk']:.0%}")
+    out.append("📱 Admin Dashboard Display:")
+    out.append(f"   Document Type: {ai_results['document_type']}")
+    out.append(f"   Confidence: {ai_results['ai_confidence']:.0%}")
+    out.append(f"   Quality Score: {ai_results['ai_quality_score']:.0%}")
+    out.append(f"   Fraud Risk: {ai_results['ai_fraud_risk']:.0%}")
     
-    print("\n📱 Official Dashboard Display:")
-    print(f"   AI Confidence: {ai_results['ai_confidence']:.0%}")
-    print(f"   Fraud Risk: {ai_results['ai_fraud_risk']:.0%}")
-    print("   Extracted Information:")
+    out.append("\n📱 Official Dashboard Display:")
+    out.append(f"   AI Confidence: {ai_results['ai_confidence']:.0%}")
+    out.append(f"   Fraud Risk: {ai_results['ai_fraud_risk']:.0%}")
+    out.append("   Extracted Information:")
     for key, value in ai_results['ai_extracted_fields'].items():
-        print(f"     {key}: {value}")
+        out.append(f"     {key}: {value}")
     
-    print("\n📱 Department Review Display:")
-    print("   AI Extracted Information:")
+    out.append("\n📱 Department Review Display:")
+    out.append("   AI Extracted Information:")
     for key, value in ai_results['ai_extracted_fields'].items():
-        print(f"     {key.replace('_', ' ').upper()}: {value}")
+        out.append(f"     {key.replace('_', ' ').upper()}: {value}")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     print("🎯 PublicPulse AI Output Results")
@@ -264,7 +363,7 @@ if __name__ == "__main__":
     print()
     
     # Run the demonstration
-    asyncio.run(demonstrate_ai_outputs())
+    asyncio.run(demonstrate_ai_outputs(realistic_timing=SIMULATE_LATENCY or "--realistic-timing" in sys.argv))
     
     # Show frontend display examples
     show_frontend_display()
@@ -4,24 +4,19 @@ Role-based testing script for PublicPulse system
 Tests all three portals with appropriate role switching
 """
 
-import requests
-import json
-import time
+import asyncio
+import httpx
 
 BASE_URL = "http://localhost:8000"
 TEST_TOKEN = "jwt_test_token"
 
-def test_citizen_role():
+async def test_citizen_role(client: httpx.AsyncClient):
     """Test citizen portal functionality"""
     print("🔵 Testing Citizen Role...")
     
     # Test document submission
-    response = requests.post(
-        f"{BASE_URL}/citizen/submit-document",
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {TEST_TOKEN}"
-        },
+    response = await client.post(
+        "/citizen/submit-document",
         json={
             "document_type": "national_id",
             "department_id": None,
@@ -39,10 +34,7 @@ def test_citizen_role():
         print(f"   Error: {response.text}")
     
     # Test my documents
-    response = requests.get(
-        f"{BASE_URL}/citizen/my-documents",
-        headers={"Authorization": f"Bearer {TEST_TOKEN}"}
-    )
+    response = await client.get("/citizen/my-documents")
     
     if response.status_code == 200:
         print("✅ Citizen my-documents: SUCCESS")
@@ -52,7 +44,7 @@ def test_citizen_role():
         print(f"❌ Citizen my-documents: FAILED ({response.status_code})")
         print(f"   Error: {response.text}")
 
-def test_official_role():
+async def test_official_role(client: httpx.AsyncClient):
     """Test official portal functionality"""
     print("\n🟡 Testing Official Role...")
     
@@ -60,10 +52,7 @@ def test_official_role():
     print("   Switching to official role...")
     
     # Test official documents
-    response = requests.get(
-        f"{BASE_URL}/official-review/documents",
-        headers={"Authorization": f"Bearer {TEST_TOKEN}"}
-    )
+    response = await client.get("/official-review/documents")
     
     if response.status_code == 200:
         print("✅ Official document review: SUCCESS")
@@ -73,7 +62,7 @@ def test_official_role():
         print(f"❌ Official document review: FAILED ({response.status_code})")
         print(f"   Error: {response.text}")
 
-def test_admin_role():
+async def test_admin_role(client: httpx.AsyncClient):
     """Test admin portal functionality"""
     print("\n🔴 Testing Admin Role...")
     
@@ -81,10 +70,7 @@ def test_admin_role():
     print("   Switching to admin role...")
     
     # Test admin documents
-    response = requests.get(
-        f"{BASE_URL}/admin/documents",
-        headers={"Authorization": f"Bearer {TEST_TOKEN}"}
-    )
+    response = await client.get("/admin/documents")
     
     if response.status_code == 200:
         print("✅ Admin document management: SUCCESS")
@@ -94,11 +80,11 @@ def test_admin_role():
         print(f"❌ Admin document management: FAILED ({response.status_code})")
         print(f"   Error: {response.text}")
 
-def test_health():
+async def test_health(client: httpx.AsyncClient):
     """Test system health"""
     print("🏥 Testing System Health...")
     
-    response = requests.get(f"{BASE_URL}/health")
+    response = await client.get("/health")
     if response.status_code == 200:
         print("✅ Backend health: SUCCESS")
         data = response.json()
@@ -106,16 +92,22 @@ def test_health():
     else:
         print(f"❌ Backend health: FAILED ({response.status_code})")
 
-def main():
+async def main():
     """Run all tests"""
     print("🚀 PublicPulse System Role Testing")
     print("=" * 50)
     
-    # Test health first
-    test_health()
-    
-    # Test citizen role (current default)
-    test_citizen_role()
+    # One keep-alive connection pool for every request
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"Authorization": f"Bearer {TEST_TOKEN}"},
+        limits=httpx.Limits(max_connections=50)
+    ) as client:
+        # Test health first
+        await test_health(client)
+        
+        # Test citizen role (current default)
+        await test_citizen_role(client)
     
     # Note: For official and admin roles, you would need to:
     # 1. Update the middleware role in access_control.py
@@ -130,7 +122,7 @@ def main():
     print("   3. Run this script again")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
 
 